@@ -0,0 +1,42 @@
+# api/busqueda.py
+"""
+Búsqueda de texto libre en piezas (`?q=` de /api/piezas/).
+
+import_mapa crea un índice full-text de Neo4j (Lucene) sobre los campos de
+texto de Pieza, con el analizador `standard-folding`: tokeniza, pasa a
+minúsculas y quita tildes, así que "ceramica" encuentra "Cerámica".
+"""
+import re
+import unicodedata
+
+INDICE_TEXTO = 'pieza_texto'
+CAMPOS_TEXTO = (
+    'nombre_comun', 'nombre_especifico', 'descripcion',
+    'iconografia', 'contexto_historico', 'marcas_inscripciones',
+)
+
+CREATE_INDICE_TEXTO = (
+    f"CREATE FULLTEXT INDEX {INDICE_TEXTO} IF NOT EXISTS "
+    f"FOR (p:Pieza) ON EACH [{', '.join('p.' + c for c in CAMPOS_TEXTO)}] "
+    "OPTIONS {indexConfig: {`fulltext.analyzer`: 'standard-folding'}}"
+)
+
+
+def fold(s):
+    """Minúsculas y sin tildes (como `standard-folding`)."""
+    s = unicodedata.normalize('NFKD', s)
+    return ''.join(ch for ch in s if not unicodedata.combining(ch)).lower()
+
+
+def fulltext_query(q):
+    """
+    Texto del usuario -> consulta Lucene: todas las palabras deben aparecer,
+    completas o como prefijo ("cera" encuentra "cerámica"). Sólo se usan
+    caracteres de palabra, así que no hay sintaxis Lucene que escapar. None si
+    no queda ninguna palabra.
+    """
+    # Los prefijos (term*) no pasan por el analizador: se pliegan aquí igual que él
+    terms = re.findall(r'\w+', fold(q or ''))
+    if not terms:
+        return None
+    return ' AND '.join(f'({t} OR {t}*)' for t in terms)
@@ -0,0 +1,71 @@
+# api/dataset.py
+"""
+Dataset activo (blue/green) y su versión.
+
+import_mapa carga cada inventario completo en un "slot" (`blue` o `green`):
+todos los nodos llevan la propiedad `dataset` con el slot en el que viven.
+El nodo (:Dataset {key: 'current'}) apunta al slot activo (`slot`), al
+anterior (`previous_slot`) y a una `version` que cambia en cada carga.
+
+La API sólo lee el slot activo, así que una importación en curso (que escribe
+en el otro slot) nunca es visible a medias, y volver atrás es mover el puntero.
+La versión se usa en las claves de caché y ETag.
+
+Para no consultar Neo4j en cada request, cada proceso recuerda el puntero
+leído durante DATASET_VERSION_TTL segundos.
+"""
+import time
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from neomodel import db
+
+from .neo import read_query
+
+SIN_VERSION = 'sin-version'
+SLOTS = ('blue', 'green')
+
+DatasetState = namedtuple('DatasetState', 'version slot previous_slot')
+
+_cached = {'state': None, 'checked': 0.0}
+
+
+def current_dataset(refresh=False):
+    now = time.monotonic()
+    if (refresh or _cached['state'] is None
+            or now - _cached['checked'] >= settings.DATASET_VERSION_TTL):
+        rows, _ = read_query(
+            "MATCH (d:Dataset {key: 'current'}) RETURN d.version, d.slot, d.previous_slot"
+        )
+        version, slot, previous = rows[0] if rows else (None, None, None)
+        _cached['state'] = DatasetState(version or SIN_VERSION, slot, previous)
+        _cached['checked'] = now
+    return _cached['state']
+
+
+def current_version():
+    return current_dataset().version
+
+
+def current_slot():
+    return current_dataset().slot
+
+
+def inactive_slot(slot):
+    """Slot donde se carga la próxima importación completa."""
+    return SLOTS[1] if slot == SLOTS[0] else SLOTS[0]
+
+
+def activate(slot):
+    """Apunta la API a `slot` (una sola escritura, atómica) con una versión nueva."""
+    version = uuid.uuid4().hex
+    db.cypher_query(
+        "MERGE (d:Dataset {key: 'current'}) "
+        "SET d.previous_slot = d.slot, d.slot = $slot, "
+        "    d.version = $version, d.importado = datetime()",
+        {'slot': slot, 'version': version},
+    )
+    _cached['state'] = None
+    return version
+
@@ -0,0 +1,118 @@
+# api/derivados.py
+"""
+Versiones web de las imágenes (miniatura, mediana y completa).
+
+Los originales suelen ser escaneos TIFF/JPEG de varios MB; la grilla del front
+sólo necesita una miniatura. Cada derivado se guarda en disco bajo
+DERIVADOS_ROOT con el hash del contenido del original en el nombre, así que no
+hay que invalidar nada: si la imagen cambia, cambia su hash y su derivado.
+
+Se generan todas en import_mapa (--derivados, en paralelo con procesos) o,
+de a una, la primera vez que se piden (vista `derivado` en api/views.py).
+"""
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.urls import reverse
+
+# Lado mayor (px) de cada versión
+RENDICIONES = {
+    'thumb': 320,
+    'medium': 1024,
+    'full': 2560,
+}
+
+_CONTENT_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+
+
+def content_type():
+    return _CONTENT_TYPES[settings.DERIVADOS_FORMATO]
+
+
+def derivado_path(file_hash, rendicion):
+    """Ruta en disco del derivado (exista o no)."""
+    ext = 'webp' if settings.DERIVADOS_FORMATO == 'webp' else 'jpg'
+    return os.path.join(settings.DERIVADOS_ROOT, file_hash[:2], f"{file_hash}-{rendicion}.{ext}")
+
+
+def derivado_url(file_hash, rendicion, request=None):
+    """URL de la vista `derivado`; None si la imagen no tiene hash (p. ej. subida por la API)."""
+    if not file_hash:
+        return None
+    rel = reverse('derivado', args=[rendicion, file_hash])
+    return request.build_absolute_uri(rel) if request else rel
+
+
+def _abrir(src_path, lado):
+    from PIL import Image, ImageOps
+
+    im = Image.open(src_path)
+    if im.format == 'JPEG':
+        # Decodifica ya reducido (1/2, 1/4, 1/8) cuando el original es mucho más grande
+        im.draft('RGB', (lado, lado))
+    im = ImageOps.exif_transpose(im)
+    if im.mode in ('I;16', 'I;16B', 'I;16L', 'I'):
+        # TIFF de 16 bits: llevar a 8 bits antes de convertir
+        im = im.point(lambda v: v * (1 / 256)).convert('L')
+    alpha = im.mode in ('RGBA', 'LA', 'PA') or 'transparency' in im.info
+    if settings.DERIVADOS_FORMATO == 'webp' and alpha:
+        return im.convert('RGBA')
+    return im.convert('RGB')
+
+
+def generar(src_path, file_hash, forzar=False, rendiciones=None):
+    """
+    Crea las versiones de `src_path` que falten (una sola decodificación del
+    original, de la más grande a la más chica). Devuelve cuántas escribió.
+    Con `rendiciones` sólo considera ésas: la vista `derivado` pide sólo la
+    que le piden, para no generar la completa cuando falta una miniatura.
+    """
+    from PIL import Image
+
+    pendientes = [
+        (r, lado) for r, lado in sorted(RENDICIONES.items(), key=lambda kv: -kv[1])
+        if (rendiciones is None or r in rendiciones)
+        and (forzar or not os.path.exists(derivado_path(file_hash, r)))
+    ]
+    if not pendientes:
+        return 0
+
+    im = _abrir(src_path, pendientes[0][1])
+    formato = settings.DERIVADOS_FORMATO.upper()
+    for rendicion, lado in pendientes:
+        im.thumbnail((lado, lado), Image.LANCZOS)
+        destino = derivado_path(file_hash, rendicion)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Escritura atómica: dos requests generando el mismo derivado no se pisan a medias
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(destino), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                im.save(f, formato, quality=settings.DERIVADOS_CALIDAD)
+            os.replace(tmp, destino)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return len(pendientes)
+
+
+def _generar_seguro(args):
+    try:
+        return generar(*args), None
+    except Exception as e:  # un archivo corrupto no debe cortar el lote
+        return 0, f"{args[0]}: {e}"
+
+
+def generar_lote(items, workers=None):
+    """
+    Genera los derivados de `items` [(ruta_original, file_hash)] en un pool de
+    procesos. Devuelve (derivados escritos, errores).
+    """
+    escritos, errores = 0, []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for n, err in pool.map(_generar_seguro, items, chunksize=8):
+            escritos += n
+            if err:
+                errores.append(err)
+    return escritos, errores
@@ -0,0 +1,211 @@
+# backend/api/management/commands/_excel.py
+"""
+Lectura del Excel del inventario para import_mapa e import_mapa_sqlite.
+
+`leer_inventario` devuelve el DataFrame ya limpio (sin columnas "fantasma",
+NaN rellenados, ordenado por número de inventario) leyendo sólo las columnas
+que usan los importadores, con tipos fijos: texto para todo salvo las medidas,
+que van como float. El motor es python-calamine si está instalado (lee el
+libro en Rust, varias veces más rápido) o, si no, openpyxl en modo read_only,
+recorriendo las filas sin armar el libro en memoria.
+
+El resultado se guarda en IMPORT_CACHE_DIR (Parquet si hay pyarrow, si no
+pickle) con una clave hecha del hash del contenido del Excel, la versión de
+pandas y las columnas leídas: reimportar el mismo archivo, o correr
+--dry_run antes de importar, no vuelve a parsearlo.
+"""
+import datetime
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+from django.conf import settings
+
+try:
+    import python_calamine
+except ImportError:  # opcional: sin él se usa openpyxl
+    python_calamine = None
+
+try:
+    import pyarrow  # noqa: F401  (motor de pandas para Parquet; fijado en requirements.txt)
+    CACHE_EXT = 'parquet'
+except ImportError:  # instalación sin pyarrow: la caché funciona igual, en pickle
+    CACHE_EXT = 'pkl'
+
+MOTORES = ('auto', 'calamine', 'openpyxl')
+
+# Sube cuando cambia la limpieza: invalida las cachés anteriores (la versión de
+# pandas y las columnas leídas ya forman parte de la clave, ver clave_cache)
+VERSION_CACHE = 1
+
+# Columnas que leen los importadores (el resto del Excel se ignora)
+COLUMNAS_TEXTO = (
+    'numero_de_inventario', 'letra', 'Revisión', 'numero_de registro_anterior', 'SURDOC',
+    'ubicacion', 'deposito', 'estante', 'caja_actual', 'tipologia', 'clasificacion', 'conjunto',
+    'nombre_comun', 'nombre_especifico', 'fecha_de_creacion', 'descripcion_col',
+    'marcas_o_inscripciones', 'contexto_historico', 'bibliografia', 'iconografia',
+    'notas_investigacion', 'avaluo', 'procedencia', 'donante', 'fecha_ingreso',
+    'estado_genral_de_conservacion', 'descripcion_cr', 'responsable_conservacion',
+    'fecha_actualizacion_cr', 'comentarios_cr', 'responsable_coleccion',
+    'fecha_ultima_modificacion', 'autor', 'filiacion_cultural', 'pais', 'localidad',
+    'coleccion', 'materialidad', 'tecnica', 'funcion', 'forma',
+)
+COLUMNAS_NUM = (
+    'peso_(gr)', 'alto_o_largo_(cm)', 'ancho_(cm)', 'profundidad_(cm)', 'diametro_(cm)', 'espesor_(mm)',
+)
+
+
+def motor(nombre='auto'):
+    """Motor a usar: 'auto' elige calamine si está instalado."""
+    if nombre == 'auto':
+        return 'calamine' if python_calamine else 'openpyxl'
+    if nombre == 'calamine' and python_calamine is None:
+        raise ImportError('python-calamine no está instalado (pip install python-calamine)')
+    return nombre
+
+
+def hash_archivo(path, chunk_size=1 << 20):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _encabezados(fila):
+    """Nombres de columna como los arma pandas: 'Unnamed: i' si está vacía, 'x.1' si se repite."""
+    fila = list(fila)
+    while fila and fila[-1] in (None, ''):
+        fila.pop()
+    nombres, vistos = [], {}
+    for i, v in enumerate(fila):
+        nombre = f'Unnamed: {i}' if v in (None, '') else str(v)
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f'{nombre}.{vistos[nombre]}'
+        else:
+            vistos[nombre] = 0
+        nombres.append(nombre)
+    return nombres
+
+
+def _indices(nombres):
+    """
+    Columna -> posición de las columnas que se leen. El Excel suele traer dos
+    columnas “fantasma”: la entre tipologia y coleccion (idx 10) y 'Unnamed: 46'
+    (entre fecha_ingreso y responsable_coleccion); si el encabezado las tiene, se saltan.
+    """
+    fantasmas = set()
+    if len(nombres) > 46:
+        fantasmas = {10, 46} if nombres[46] == 'Unnamed: 46' else {10}
+    buscadas = set(COLUMNAS_TEXTO) | set(COLUMNAS_NUM)
+    return {n: i for i, n in enumerate(nombres) if n in buscadas and i not in fantasmas}
+
+
+def _texto(v):
+    """Celda -> str, como la escribiría to_csv (fechas sin hora 00:00, enteros sin '.0')."""
+    if v is None:
+        return ''
+    if isinstance(v, str):
+        return v
+    if isinstance(v, datetime.datetime):
+        return v.date().isoformat() if v.time() == datetime.time() else v.isoformat(sep=' ')
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _filas_openpyxl(path):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()   # la dimensión guardada en el archivo puede estar mal
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _filas_calamine(path):
+    wb = python_calamine.CalamineWorkbook.from_path(str(path))
+    # skip_empty_area=False: sin esto una columna A o fila 1 vacías correrían los índices
+    yield from wb.get_sheet_by_index(0).to_python(skip_empty_area=False)
+
+
+def _leer(path, nombre_motor):
+    """Primera hoja con header=1 (fila 0: título), sólo las columnas buscadas."""
+    filas = _filas_calamine(path) if nombre_motor == 'calamine' else _filas_openpyxl(path)
+    next(filas, None)   # título
+    indices = _indices(_encabezados(next(filas, ())))
+    if 'numero_de_inventario' not in indices:
+        raise ValueError("El Excel no tiene la columna 'numero_de_inventario' en la segunda fila")
+    cols = {n: [] for n in indices}
+    for fila in filas:
+        if not any(v not in (None, '') for v in fila):
+            continue   # filas vacías (pandas también las salta)
+        ancho = len(fila)
+        for n, i in indices.items():
+            cols[n].append(fila[i] if i < ancho else None)
+
+    df = pd.DataFrame({
+        n: (pd.to_numeric(pd.Series(vals, dtype=object), errors='coerce').fillna(0).astype('float64')
+            if n in COLUMNAS_NUM else pd.Series([_texto(v) for v in vals], dtype=object))
+        for n, vals in cols.items()
+    })
+    # Las columnas que falten quedan vacías (los importadores hacen .get / row.get)
+    for n in COLUMNAS_TEXTO:
+        if n not in df.columns:
+            df[n] = ''
+
+    # Ordenar por número inventario (numérico); orden estable para que la fila de
+    # la pieza siga antes que las de sus componentes
+    df['__num'] = pd.to_numeric(df['numero_de_inventario'], errors='coerce')
+    df = df[df['__num'].notnull()].sort_values('__num', kind='stable')
+    df['numero_de_inventario'] = df['__num'].astype(int).astype(str)
+    return df.drop(columns='__num').reset_index(drop=True)
+
+
+def _cache_path(clave):
+    return os.path.join(settings.IMPORT_CACHE_DIR, f'inventario-{clave}.{CACHE_EXT}')
+
+
+def clave_cache(path):
+    """
+    Hash del contenido del Excel (no la ruta ni la fecha del archivo) más lo
+    que cambia el DataFrame resultante sin cambiar el Excel: la versión de la
+    limpieza, la de pandas y las columnas leídas.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr((VERSION_CACHE, pd.__version__, COLUMNAS_TEXTO, COLUMNAS_NUM)).encode('utf-8'))
+    return f'{hash_archivo(path)}-{h.hexdigest()}'
+
+
+def leer_inventario(path, nombre_motor='auto', cache=True):
+    """
+    DataFrame limpio del Excel y de dónde salió ('caché' o el motor usado).
+    Con `cache=False` (--sin_cache) no se lee ni se escribe la caché (ni se
+    hashea el archivo).
+    """
+    destino = _cache_path(clave_cache(path)) if cache else None
+    if destino and os.path.exists(destino):
+        try:
+            if CACHE_EXT == 'parquet':
+                return pd.read_parquet(destino), 'caché'
+            with open(destino, 'rb') as f:
+                return pickle.load(f), 'caché'
+        except Exception:
+            pass   # caché corrupta o de otra versión de pandas: se vuelve a leer el Excel
+
+    nombre_motor = motor(nombre_motor)
+    df = _leer(path, nombre_motor)
+    if destino:
+        os.makedirs(settings.IMPORT_CACHE_DIR, exist_ok=True)
+        tmp = f'{destino}.{os.getpid()}.tmp'
+        if CACHE_EXT == 'parquet':
+            df.to_parquet(tmp, index=False)
+        else:
+            with open(tmp, 'wb') as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, destino)   # atómico: otra importación nunca lee un archivo a medias
+    return df, nombre_motor
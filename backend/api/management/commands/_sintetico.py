@@ -0,0 +1,228 @@
+# backend/api/management/commands/_sintetico.py
+"""
+Inventario sintético para los benchmarks (bench_api, bench_import).
+
+Misma semilla, mismo inventario. Las proporciones imitan el inventario real:
+pocas colecciones, unos cientos de países/localidades, muchos autores pero
+con la mayoría de las piezas concentradas en unos pocos (pesos 1/rango), un
+tercio de las piezas con componentes (a, b, c...) y una a tres imágenes por
+pieza más una por componente.
+
+`escribir_excel` y `escribir_imagenes` vuelcan ese inventario con el formato
+que lee import_mapa: planilla con título en la primera fila, encabezados en
+la segunda (con las dos columnas "fantasma") y una fila por componente
+después de la de la pieza; imágenes 00027.jpg, 00027_2.jpg, 00027a.jpg.
+"""
+import io
+import os
+import random
+
+from openpyxl import Workbook
+from PIL import Image
+
+TIPOLOGIAS = (
+    'Cerámica', 'Textil', 'Orfebrería', 'Escultura', 'Pintura', 'Cestería', 'Instrumento musical',
+    'Máscara', 'Herramienta', 'Adorno corporal', 'Arma', 'Recipiente', 'Fotografía', 'Grabado',
+    'Mobiliario',
+)
+COLECCIONES = (
+    'Colección Arqueológica', 'Colección Etnográfica', 'Colección Popular', 'Colección Andina',
+    'Colección Mapuche', 'Colección Rapa Nui', 'Colección Textil', 'Colección Fotográfica',
+)
+PAISES = (
+    'Chile', 'Perú', 'Bolivia', 'Argentina', 'Ecuador', 'Colombia', 'México', 'Guatemala',
+    'Brasil', 'Paraguay', 'Uruguay', 'Venezuela', 'Panamá', 'Costa Rica', 'Honduras',
+    'Nicaragua', 'Cuba', 'Haití', 'República Dominicana', 'El Salvador',
+)
+CULTURAS = (
+    'Mapuche', 'Aymara', 'Quechua', 'Diaguita', 'Inca', 'Moche', 'Nazca', 'Chancay', 'Chimú',
+    'Tiwanaku', 'Maya', 'Azteca', 'Guaraní', 'Selk\'nam', 'Kawésqar', 'Yagán', 'Rapa Nui',
+    'Atacameña', 'Chinchorro', 'Wari', 'Paracas', 'Tairona', 'Muisca', 'Zapoteca', 'Mixteca',
+    'Olmeca', 'Taíno', 'Lenca', 'Shuar', 'Wichí',
+)
+MATERIALES = (
+    'arcilla', 'lana', 'algodón', 'plata', 'oro', 'cobre', 'madera', 'piedra', 'hueso', 'cuero',
+    'fibra vegetal', 'plumas', 'concha', 'vidrio', 'papel', 'tela', 'cerámica', 'bronce',
+    'obsidiana', 'jade', 'turquesa', 'cuerno', 'calabaza', 'totora', 'mimbre', 'coligüe',
+    'crin', 'alpaca', 'vicuña', 'llama', 'pigmento', 'resina', 'cera', 'hierro', 'estaño',
+    'semillas', 'caña', 'corteza', 'mostacillas', 'cobre dorado',
+)
+TECNICAS = (
+    'modelado', 'torneado', 'tejido a telar', 'tejido a palillo', 'bordado', 'repujado',
+    'fundición', 'tallado', 'pulido', 'pintado', 'engobe', 'cocción', 'trenzado', 'anudado',
+    'cincelado', 'grabado', 'laminado', 'teñido', 'amarrado', 'cosido', 'enlazado', 'martillado',
+    'filigrana', 'incisión', 'estampado',
+)
+NOMBRES = (
+    'Juan', 'María', 'José', 'Ana', 'Luis', 'Rosa', 'Pedro', 'Carmen', 'Jorge', 'Elena', 'Raúl',
+    'Lucía', 'Andrés', 'Sofía', 'Tomás', 'Inés', 'Ramón', 'Teresa', 'Óscar', 'Violeta',
+)
+APELLIDOS = (
+    'Pérez', 'González', 'Muñoz', 'Rojas', 'Díaz', 'Soto', 'Contreras', 'Silva', 'Martínez',
+    'Sepúlveda', 'Morales', 'Rodríguez', 'López', 'Fuentes', 'Hernández', 'Torres', 'Araya',
+    'Flores', 'Espinoza', 'Valenzuela', 'Castillo', 'Ramírez', 'Reyes', 'Gutiérrez', 'Castro',
+    'Vargas', 'Álvarez', 'Vásquez', 'Tapia', 'Fernández', 'Sánchez', 'Carrasco', 'Gómez',
+    'Cortés', 'Herrera', 'Núñez', 'Jara', 'Vergara', 'Rivera', 'Figueroa',
+)
+FORMAS = ('circular', 'rectangular', 'globular', 'cilíndrica', 'troncocónica', 'irregular', 'ovalada')
+FUNCIONES = ('ceremonial', 'doméstica', 'ritual', 'ornamental', 'utilitaria', 'funeraria')
+ESTADOS = ('Bueno', 'Regular', 'Malo', 'Muy bueno')
+PALABRAS = (
+    'vasija', 'manta', 'trarilonco', 'chaguay', 'tupu', 'kultrún', 'aríbalo', 'cántaro', 'poncho',
+    'faja', 'collar', 'figura', 'antropomorfa', 'zoomorfa', 'decoración', 'geométrica', 'roja',
+    'negra', 'blanca', 'asa', 'borde', 'base', 'cuello', 'motivo', 'escalonado', 'greca', 'franja',
+    'ritual', 'ceremonial', 'doméstico', 'pequeño', 'grande', 'fragmento', 'restaurado', 'pieza',
+)
+
+
+def _pesos(n):
+    # Pocos valores concentran la mayoría de las piezas
+    return [1 / (i + 1) for i in range(n)]
+
+
+def inventario(n, seed=0):
+    """
+    Genera `n` piezas (numeradas 1..n) como dicts con los campos del Excel
+    ya separados: listas de materiales/técnicas, letras de componentes e
+    imágenes como (nombre de archivo, letra).
+    """
+    rng = random.Random(seed)
+    autores = list(dict.fromkeys(
+        f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}, {rng.choice(NOMBRES)}"
+        for _ in range(max(20, n // 20))
+    ))
+    localidades = [
+        (f"{rng.choice(PALABRAS).capitalize()} {rng.choice(APELLIDOS)} {i}", rng.choice(PAISES))
+        for i in range(max(10, n // 50))
+    ]
+    pesos_autor, pesos_loc = _pesos(len(autores)), _pesos(len(localidades))
+
+    def frase(k):
+        return ' '.join(rng.choice(PALABRAS) for _ in range(k)).capitalize()
+
+    for num in range(1, n + 1):
+        localidad, pais = rng.choices(localidades, pesos_loc)[0]
+        letras = []
+        if rng.random() < 0.3:
+            letras = [chr(ord('a') + i) for i in range(rng.randint(2, 4))]
+        imagenes = [(f"{num:05d}.jpg", '')]
+        imagenes += [(f"{num:05d}_{k}.jpg", '') for k in range(2, rng.randint(1, 3) + 1)]
+        imagenes += [(f"{num:05d}{letra}.jpg", letra) for letra in letras]
+        yield {
+            'numero': num,
+            'tipologia': rng.choice(TIPOLOGIAS),
+            'nombre_comun': frase(2),
+            'nombre_especifico': frase(4),
+            'descripcion': frase(rng.randint(10, 40)),
+            'autor': rng.choices(autores, pesos_autor)[0] if rng.random() < 0.7 else '',
+            'coleccion': rng.choice(COLECCIONES),
+            'pais': pais,
+            'localidad': localidad,
+            'cultura': rng.choice(CULTURAS),
+            'materiales': rng.sample(MATERIALES, rng.randint(1, 3)),
+            'tecnicas': rng.sample(TECNICAS, rng.randint(0, 2)),
+            'fecha_creacion': str(rng.randint(1200, 1990)),
+            'estado': rng.choice(ESTADOS),
+            'forma': rng.choice(FORMAS),
+            'funcion': rng.choice(FUNCIONES),
+            'peso_gr': round(rng.uniform(5, 5000), 1),
+            'alto_cm': round(rng.uniform(1, 120), 1),
+            'ancho_cm': round(rng.uniform(1, 80), 1),
+            'componentes': [
+                {
+                    'letra': letra,
+                    'nombre_comun': frase(2),
+                    'descripcion': frase(rng.randint(5, 15)),
+                    'materiales': rng.sample(MATERIALES, rng.randint(1, 2)),
+                    'tecnicas': rng.sample(TECNICAS, rng.randint(0, 1)),
+                    'peso_gr': round(rng.uniform(1, 500), 1),
+                }
+                for letra in letras
+            ],
+            'imagenes': imagenes,
+        }
+
+
+# Encabezados del Excel del inventario, en orden. None = columna "fantasma"
+# sin encabezado (pandas la lee como 'Unnamed: 10' / 'Unnamed: 46').
+COLUMNAS_EXCEL = (
+    'numero_de_inventario', 'letra', 'Revisión', 'numero_de registro_anterior', 'SURDOC',
+    'ubicacion', 'deposito', 'estante', 'caja_actual', 'tipologia', None, 'coleccion',
+    'clasificacion', 'conjunto', 'nombre_comun', 'nombre_especifico', 'autor',
+    'filiacion_cultural', 'pais', 'localidad', 'fecha_de_creacion', 'descripcion_col',
+    'marcas_o_inscripciones', 'contexto_historico', 'bibliografia', 'iconografia',
+    'notas_investigacion', 'materialidad', 'tecnica', 'funcion', 'forma', 'peso_(gr)',
+    'alto_o_largo_(cm)', 'ancho_(cm)', 'profundidad_(cm)', 'diametro_(cm)', 'espesor_(mm)',
+    'estado_genral_de_conservacion', 'descripcion_cr', 'responsable_conservacion',
+    'fecha_actualizacion_cr', 'comentarios_cr', 'avaluo', 'procedencia', 'donante',
+    'fecha_ingreso', None, 'responsable_coleccion', 'fecha_ultima_modificacion',
+)
+
+
+def _filas_excel(p):
+    """Fila de la pieza y una por componente (dicts encabezado -> valor)."""
+    num = p['numero']
+    pieza = {
+        'numero_de_inventario': num, 'letra': None, 'Revisión': 'Revisado',
+        'SURDOC': f"7-{num}", 'ubicacion': 'Depósito', 'deposito': f"D{num % 4 + 1}",
+        'estante': f"E{num % 30 + 1}", 'caja_actual': f"C{num % 500 + 1}",
+        'tipologia': p['tipologia'], 'coleccion': p['coleccion'],
+        'nombre_comun': p['nombre_comun'], 'nombre_especifico': p['nombre_especifico'],
+        'autor': p['autor'] or None, 'filiacion_cultural': p['cultura'], 'pais': p['pais'],
+        'localidad': p['localidad'], 'fecha_de_creacion': p['fecha_creacion'],
+        'descripcion_col': p['descripcion'], 'materialidad': '; '.join(p['materiales']),
+        'tecnica': '; '.join(p['tecnicas']) or None, 'funcion': p['funcion'], 'forma': p['forma'],
+        'peso_(gr)': p['peso_gr'], 'alto_o_largo_(cm)': p['alto_cm'], 'ancho_(cm)': p['ancho_cm'],
+        'estado_genral_de_conservacion': p['estado'], 'fecha_ingreso': '1990-01-01',
+        'responsable_coleccion': 'Equipo MAPA',
+    }
+    filas = [pieza]
+    for c in p['componentes']:
+        filas.append(dict(
+            pieza, letra=c['letra'], nombre_comun=c['nombre_comun'], descripcion_col=c['descripcion'],
+            materialidad='; '.join(c['materiales']), tecnica='; '.join(c['tecnicas']) or None,
+            **{'peso_(gr)': c['peso_gr']},
+        ))
+    return filas
+
+
+def escribir_excel(path, piezas):
+    """Planilla del inventario (openpyxl en modo write_only: no arma el libro en memoria)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Inventario')
+    ws.append(['Inventario sintético MAPA'])
+    ws.append(list(COLUMNAS_EXCEL))
+    filas = 0
+    for p in piezas:
+        for fila in _filas_excel(p):
+            ws.append([fila.get(col) if col else None for col in COLUMNAS_EXCEL])
+            filas += 1
+    wb.save(path)
+    return filas
+
+
+def _jpeg_base():
+    buf = io.BytesIO()
+    Image.new('RGB', (64, 48), (180, 120, 60)).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+def escribir_imagenes(root, piezas, kb=64, por_carpeta=1000, seed=0):
+    """
+    Árbol de imágenes de `piezas`: un JPEG válido de `kb` KB por archivo, en
+    subcarpetas de `por_carpeta` números. Después del marcador de fin van el
+    nombre y relleno aleatorio, así cada archivo tiene su propio hash y
+    leerlo cuesta lo que cuesta su tamaño.
+    """
+    rng = random.Random(seed)
+    base = _jpeg_base()
+    relleno = max(0, kb * 1024 - len(base))
+    total = 0
+    for p in piezas:
+        carpeta = os.path.join(root, f"lote_{(p['numero'] - 1) // por_carpeta:03d}")
+        os.makedirs(carpeta, exist_ok=True)
+        for file_name, _ in p['imagenes']:
+            with open(os.path.join(carpeta, file_name), 'wb') as f:
+                f.write(base + file_name.encode() + rng.randbytes(relleno))
+            total += 1
+    return total
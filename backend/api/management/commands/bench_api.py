@@ -0,0 +1,231 @@
+# backend/api/management/commands/bench_api.py
+import hashlib
+import json
+import math
+import random
+import re
+import time
+import tracemalloc
+from urllib.parse import quote
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from neomodel import db
+
+from api import dataset
+from api.management.commands._sintetico import inventario
+from api.management.commands.import_mapa import (
+    COMPONENTE_PROPS, IMAGE_COLS, PIEZA_PROPS, Command as ImportCommand,
+)
+
+# Slot propio: la API lo lee sólo mientras corre el benchmark y no toca blue/green
+SLOT = 'bench'
+
+_SERVER_TIMING_RE = re.compile(r'cypher;desc="(\d+) consultas";dur=([\d.]+)')
+
+
+def _percentil(xs, p):
+    """Percentil por rango más cercano (sin interpolar)."""
+    xs = sorted(xs)
+    return xs[max(0, math.ceil(p / 100 * len(xs)) - 1)]
+
+
+def _filas(piezas):
+    """Inventario sintético -> filas de pieza (formato de _pieza_rows) y DataFrame de imágenes."""
+    rows, imgs = [], []
+    for p in piezas:
+        num = str(p['numero'])
+        props = dict.fromkeys(PIEZA_PROPS)
+        props.update(
+            numero_inventario=num, numero_inventario_int=p['numero'],
+            tipologia=p['tipologia'], tipologia_norm=p['tipologia'].lower(),
+            nombre_comun=p['nombre_comun'], nombre_especifico=p['nombre_especifico'],
+            descripcion=p['descripcion'], fecha_creacion=p['fecha_creacion'],
+            estado_conservacion=p['estado'],
+        )
+        componentes = []
+        for c in p['componentes']:
+            cprops = dict.fromkeys(COMPONENTE_PROPS)
+            cprops.update(
+                pieza_numero_inventario=num, pieza_numero_inventario_int=p['numero'], letra=c['letra'],
+                nombre_comun=c['nombre_comun'], descripcion=c['descripcion'], peso_kg=c['peso_gr'] / 1000.0,
+            )
+            componentes.append({'props': cprops, 'materiales': c['materiales'], 'tecnicas': c['tecnicas']})
+        row = {
+            'props': props, 'materiales': p['materiales'], 'tecnicas': p['tecnicas'],
+            'componentes': componentes,
+            'autor': p['autor'] or None, 'coleccion': p['coleccion'], 'filiacion_cultural': p['cultura'],
+            'pais': p['pais'], 'localidad': p['localidad'],
+        }
+        for col in ('autor', 'coleccion', 'filiacion_cultural', 'pais', 'localidad'):
+            row[f'{col}_norm'] = row[col].lower() if row[col] else None
+        rows.append(row)
+        for file_name, letra in p['imagenes']:
+            h = hashlib.blake2b(file_name.encode(), digest_size=16).hexdigest()
+            imgs.append((file_name, num, letra, h, 0, 0.0))
+    return rows, pd.DataFrame(imgs, columns=IMAGE_COLS)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de la API sobre un catálogo sintético (slot "bench" en Neo4j): '
+        'p50/p95, consultas Cypher por request y memoria pico por endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--piezas', type=int, default=1000, help='Tamaño del catálogo sintético (1k–100k)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=30, help='Requests medidos por endpoint')
+        parser.add_argument('--export_requests', type=int, default=3,
+                            help='Requests medidos para las exportaciones completas')
+        parser.add_argument('--reutilizar', action='store_true',
+                            help='No regenera el catálogo si el slot bench ya tiene esa cantidad de piezas')
+        parser.add_argument('--conservar', action='store_true', help='No borra el slot bench al terminar')
+        parser.add_argument('--guardar', help='Escribe los resultados como baseline JSON en esta ruta')
+        parser.add_argument('--baseline', help='Compara con un baseline JSON y falla si hay regresiones')
+        parser.add_argument('--tolerancia', type=float, default=0.25,
+                            help='Aumento de p95 permitido respecto del baseline (0.25 = 25%%)')
+
+    def handle(self, *args, **opt):
+        n = opt['piezas']
+        imp = ImportCommand()
+        imp._create_schema()
+
+        rows, _ = db.cypher_query("MATCH (p:Pieza) WHERE p.dataset = $slot RETURN count(p)", {'slot': SLOT})
+        if opt['reutilizar'] and rows[0][0] == n:
+            self.stdout.write(f"Reutilizando catálogo sintético de {n} piezas")
+        else:
+            t0 = time.monotonic()
+            self._generar(imp, n, opt['seed'])
+            self.stdout.write(f"Catálogo sintético de {n} piezas generado en {time.monotonic() - t0:.1f}s")
+
+        # La API lee el slot bench mientras dura la medición (ver api/dataset.py)
+        dataset._cached.update(
+            state=dataset.DatasetState(f"bench-{n}-{opt['seed']}-{time.time():.0f}", SLOT, None),
+            checked=time.monotonic(),
+        )
+        try:
+            with override_settings(ALLOWED_HOSTS=['*'], DATASET_VERSION_TTL=float('inf')):
+                resultados = self._medir(n, opt)
+        finally:
+            dataset._cached.update(state=None, checked=0.0)
+            if not opt['conservar']:
+                imp._wipe_slot(SLOT)
+
+        self._reportar(resultados)
+        data = {'piezas': n, 'seed': opt['seed'], 'endpoints': resultados}
+        if opt['guardar']:
+            with open(opt['guardar'], 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Baseline guardado en {opt['guardar']}")
+        if opt['baseline']:
+            self._comparar(data, opt['baseline'], opt['tolerancia'])
+
+    def _generar(self, imp, n, seed):
+        """Carga el catálogo con los mismos pasos (y consultas) que import_mapa."""
+        imp._wipe_slot(SLOT)
+        rows, img_df = _filas(inventario(n, seed))
+        imp._create_domains(SLOT, rows, [])
+        imp._load_piezas(SLOT, rows)
+        imp._load_imagenes(SLOT, img_df)
+        db.cypher_query("CALL db.awaitIndexes(600)")
+
+    def _endpoints(self, n, rng):
+        """(nombre, función que arma la URL, requests medidos)."""
+        rows, _ = db.cypher_query(
+            "MATCH (c:Coleccion {dataset: $slot}) RETURN c.nombre LIMIT 1", {'slot': SLOT}
+        )
+        coleccion = quote(rows[0][0]) if rows else ''
+        pagina_profunda = max(1, n // 20)   # a mitad del listado (10 por página)
+        return [
+            ('piezas_list', lambda: '/api/piezas/', None),
+            ('piezas_list_profunda', lambda: f'/api/piezas/?page={pagina_profunda}', None),
+            ('piezas_cursor', lambda: '/api/piezas/?cursor=', None),
+            ('piezas_filtro', lambda: f'/api/piezas/?coleccion__nombre={coleccion}', None),
+            ('piezas_q', lambda: '/api/piezas/?q=vasija+roja', None),
+            ('piezas_retrieve', lambda: f'/api/piezas/{rng.randint(1, n)}/', None),
+            ('piezas_bulk', lambda: '/api/piezas/bulk/?ids=' + ','.join(
+                str(rng.randint(1, n)) for _ in range(50)), None),
+            ('piezas_facets', lambda: '/api/piezas/facets/', None),
+            ('piezas_export', lambda: '/api/piezas/export/', 'export'),
+            ('piezas_export_ndjson', lambda: '/api/piezas/export/?stream=ndjson', 'export'),
+            ('autores', lambda: '/api/autores/', None),
+            ('paises', lambda: '/api/paises/', None),
+            ('colecciones', lambda: '/api/colecciones/', None),
+            ('localidades', lambda: '/api/localidades/', None),
+            ('tipologias', lambda: '/api/tipologias/', None),
+            ('suggest', lambda: f"/api/suggest/?field=autor&prefix={rng.choice('aeiouprsgm')}", None),
+            ('imagenes', lambda: '/api/imagenes/', None),
+            ('componentes', lambda: '/api/componentes/', None),
+        ]
+
+    def _get(self, client, url):
+        """(ms, consultas Cypher) de un GET, leyendo también las respuestas en streaming."""
+        t0 = time.perf_counter()
+        r = client.get(url)
+        if r.streaming:
+            for _ in r.streaming_content:
+                pass
+        ms = (time.perf_counter() - t0) * 1000
+        if r.status_code != 200:
+            raise CommandError(f"{url} respondió {r.status_code}")
+        m = _SERVER_TIMING_RE.search(r.get('Server-Timing', ''))
+        return ms, int(m.group(1)) if m else 0
+
+    def _medir(self, n, opt):
+        rng = random.Random(opt['seed'])
+        client = Client()
+        resultados = {}
+        for nombre, url, tipo in self._endpoints(n, rng):
+            veces = opt['export_requests'] if tipo == 'export' else opt['requests']
+            for _ in range(2):   # calentamiento (caché de planes, índices en memoria)
+                self._get(client, url())
+            tiempos, consultas = [], []
+            for _ in range(veces):
+                ms, q = self._get(client, url())
+                tiempos.append(ms)
+                consultas.append(q)
+
+            # Memoria en una pasada aparte: tracemalloc distorsiona los tiempos
+            tracemalloc.start()
+            try:
+                self._get(client, url())
+                _, pico = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            resultados[nombre] = {
+                'p50_ms': round(_percentil(tiempos, 50), 2),
+                'p95_ms': round(_percentil(tiempos, 95), 2),
+                'consultas': round(sum(consultas) / len(consultas), 1),
+                'pico_kb': round(pico / 1024, 1),
+            }
+        return resultados
+
+    def _reportar(self, resultados):
+        self.stdout.write(f"{'endpoint':<24}{'p50 ms':>10}{'p95 ms':>10}{'consultas':>11}{'pico KB':>11}")
+        for nombre, r in resultados.items():
+            self.stdout.write(
+                f"{nombre:<24}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['consultas']:>11.1f}{r['pico_kb']:>11.1f}"
+            )
+
+    def _comparar(self, data, path, tolerancia):
+        with open(path, encoding='utf-8') as f:
+            base = json.load(f)
+        if base.get('piezas') != data['piezas']:
+            self.stdout.write(self.style.WARNING(
+                f"El baseline es de {base.get('piezas')} piezas y esta corrida de {data['piezas']}"
+            ))
+        regresiones = []
+        for nombre, b in base['endpoints'].items():
+            r = data['endpoints'].get(nombre)
+            if r is None:
+                continue
+            if r['p95_ms'] > b['p95_ms'] * (1 + tolerancia):
+                regresiones.append(f"{nombre}: p95 {b['p95_ms']:.1f} -> {r['p95_ms']:.1f} ms")
+            if r['consultas'] > b['consultas']:
+                regresiones.append(f"{nombre}: consultas {b['consultas']} -> {r['consultas']}")
+        if regresiones:
+            raise CommandError("Regresiones respecto del baseline:\n  " + "\n  ".join(regresiones))
+        self.stdout.write(self.style.SUCCESS(f"✅ Sin regresiones respecto de {path}"))
@@ -0,0 +1,143 @@
+# backend/api/management/commands/bench_import.py
+import io
+import json
+import os
+import tempfile
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from api.management.commands._excel import MOTORES
+from api.management.commands._sintetico import escribir_excel, escribir_imagenes, inventario
+from api.management.commands.import_mapa import Command as ImportCommand
+
+# Slot propio (import_mapa --slot): no se publica ni toca blue/green ni el de bench_api
+SLOT = 'bench_import'
+
+
+def _etiqueta(n):
+    return f"{n // 1000}k" if n % 1000 == 0 else str(n)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de import_mapa: genera un inventario sintético (Excel + carpeta de imágenes) '
+        'a varias escalas, lo importa en un slot aparte y muestra el tiempo de cada etapa'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escalas', default='1000,5000,20000', help='Cantidades de piezas, separadas por coma')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--kb_imagen', type=int, default=64, help='Tamaño de cada imagen sintética (KB)')
+        parser.add_argument('--repeticiones', type=int, default=1,
+                            help='Importaciones por escala; desde la segunda se reutilizan el Excel ya '
+                                 'leído (caché) y los hashes de imágenes')
+        parser.add_argument('--excel_engine', choices=MOTORES, default='auto')
+        parser.add_argument('--directorio',
+                            help='Dónde dejar (y reutilizar) los Excel e imágenes generados; '
+                                 'sin esta opción se usa una carpeta temporal')
+        parser.add_argument('--solo_generar', action='store_true',
+                            help='Sólo escribe los archivos en --directorio (no necesita Neo4j)')
+        parser.add_argument('--guardar', help='Escribe los resultados como JSON en esta ruta')
+
+    def handle(self, *args, **opt):
+        try:
+            escalas = [int(x) for x in opt['escalas'].split(',') if x.strip()]
+        except ValueError:
+            raise CommandError('--escalas debe ser una lista de enteros, p. ej. 1000,5000,20000')
+        if opt['solo_generar'] and not opt['directorio']:
+            raise CommandError('--solo_generar necesita --directorio')
+
+        if opt['directorio']:
+            os.makedirs(opt['directorio'], exist_ok=True)
+            self._correr(opt['directorio'], escalas, opt)
+        else:
+            with tempfile.TemporaryDirectory(prefix='bench_import_') as tmp:
+                self._correr(tmp, escalas, opt)
+
+    def _correr(self, base, escalas, opt):
+        corridas = []
+        try:
+            for n in escalas:
+                excel, imagenes, filas, n_img = self._generar(base, n, opt)
+                if opt['solo_generar']:
+                    continue
+                # Sin hashes previos ni Excel en caché: la primera corrida es en frío
+                ImportCommand()._wipe_slot(SLOT)
+                with tempfile.TemporaryDirectory(prefix='bench_import_cache_') as cache_dir, \
+                        override_settings(IMPORT_CACHE_DIR=cache_dir):
+                    corridas.extend(self._importar(n, excel, imagenes, filas, n_img, opt))
+        finally:
+            if not opt['solo_generar']:
+                ImportCommand()._wipe_slot(SLOT)
+
+        if not corridas:
+            return
+        self._reportar(corridas)
+        if opt['guardar']:
+            data = {'seed': opt['seed'], 'kb_imagen': opt['kb_imagen'], 'corridas': corridas}
+            with open(opt['guardar'], 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultados guardados en {opt['guardar']}")
+
+    def _importar(self, n, excel, imagenes, filas, n_img, opt):
+        corridas = []
+        for rep in range(1, opt['repeticiones'] + 1):
+            cmd = ImportCommand()
+            t0 = time.monotonic()
+            call_command(
+                cmd, excel=excel, images_dir=imagenes, slot=SLOT, excel_engine=opt['excel_engine'],
+                stdout=io.StringIO(),
+            )
+            corridas.append({
+                'piezas': n, 'filas_excel': filas, 'imagenes': n_img, 'repeticion': rep,
+                'total_s': round(time.monotonic() - t0, 3),
+                'etapas': {k: round(v, 3) for k, v in cmd.timings.items()},
+            })
+            self.stdout.write(
+                f"{_etiqueta(n)} #{rep}: {corridas[-1]['total_s']:.1f}s "
+                f"({n / corridas[-1]['total_s']:.0f} piezas/s)"
+            )
+        return corridas
+
+    def _generar(self, base, n, opt):
+        """Excel + carpeta de imágenes para `n` piezas (se reutilizan si ya existen en `base`)."""
+        nombre = f"inventario_{n}_s{opt['seed']}_{opt['kb_imagen']}kb"
+        excel = os.path.join(base, nombre + '.xlsx')
+        imagenes = os.path.join(base, nombre)
+        listo = os.path.join(imagenes, '.completo')   # marca: la generación terminó
+        if os.path.exists(listo) and os.path.exists(excel):
+            with open(listo) as f:
+                filas, n_img = map(int, f.read().split())
+            self.stdout.write(f"{_etiqueta(n)}: reutilizando {excel}")
+            return excel, imagenes, filas, n_img
+
+        t0 = time.monotonic()
+        filas = escribir_excel(excel, inventario(n, opt['seed']))
+        n_img = escribir_imagenes(imagenes, inventario(n, opt['seed']), kb=opt['kb_imagen'], seed=opt['seed'])
+        with open(listo, 'w') as f:
+            f.write(f"{filas} {n_img}")
+        self.stdout.write(
+            f"{_etiqueta(n)}: {filas} filas de Excel y {n_img} imágenes generadas "
+            f"en {time.monotonic() - t0:.1f}s ({imagenes})"
+        )
+        return excel, imagenes, filas, n_img
+
+    def _reportar(self, corridas):
+        """Tabla etapa x corrida (segundos), con el total y el porcentaje de la etapa más lenta."""
+        etapas = list(dict.fromkeys(k for c in corridas for k in c['etapas']))
+        cols = [
+            _etiqueta(c['piezas']) + (f"#{c['repeticion']}" if c['repeticion'] > 1 else '')
+            for c in corridas
+        ]
+        self.stdout.write(f"{'etapa (s)':<20}" + ''.join(f"{col:>11}" for col in cols))
+        for etapa in etapas:
+            self.stdout.write(
+                f"{etapa:<20}" + ''.join(f"{c['etapas'].get(etapa, 0.0):>11.2f}" for c in corridas)
+            )
+        self.stdout.write(f"{'total':<20}" + ''.join(f"{c['total_s']:>11.2f}" for c in corridas))
+        for c, col in zip(corridas, cols):
+            etapa, s = max(c['etapas'].items(), key=lambda kv: kv[1])
+            self.stdout.write(f"{col}: la etapa más lenta es {etapa} ({s / c['total_s']:.0%} del total)")
@@ -1,53 +1,231 @@
 # backend/api/management/commands/import_mapa.py
+import csv
+import hashlib
+import io
+import json
 import os
 import re
 import time
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from neomodel import db
 
+from api.busqueda import CREATE_INDICE_TEXTO
+from api.dataset import SLOTS, activate, current_dataset, inactive_slot
+from api.derivados import generar_lote
+from api.media import imagen_uid
+from api.management.commands._excel import MOTORES, leer_inventario
+
+IMAGE_EXTS = ('jpg', 'jpeg', 'png', 'tif', 'tiff')
+IMAGE_RE = re.compile(r'^0*(\d+)([A-Za-z]?)(?:.*)$')
+IMAGE_COLS = ['file_name', 'num', 'letra', 'file_hash', 'file_size', 'file_mtime']
+
+# Hilos para hashear imágenes (la lectura y blake2b liberan el GIL)
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Filas por transacción al cargar con UNWIND $rows
+BATCH_SIZE = 1000
+
+# Columnas de piezas_df / comp_df que quedan como propiedades del nodo
+PIEZA_PROPS = (
+    'numero_inventario', 'numero_inventario_int', 'revision', 'numero_registro_anterior',
+    'codigo_surdoc', 'ubicacion', 'deposito', 'estante', 'caja_actual', 'tipologia',
+    'tipologia_norm', 'clasificacion', 'conjunto', 'nombre_comun', 'nombre_especifico',
+    'fecha_creacion', 'descripcion', 'marcas_inscripciones', 'contexto_historico',
+    'bibliografia', 'iconografia', 'notas_investigacion', 'avaluo', 'procedencia', 'donante',
+    'fecha_ingreso', 'estado_conservacion', 'descripcion_conservacion',
+    'responsable_conservacion', 'fecha_actualizacion_conservacion', 'comentarios_conservacion',
+    'responsable_coleccion', 'fecha_ultima_modificacion', 'row_hash',
+)
+COMPONENTE_PROPS = (
+    'pieza_numero_inventario', 'pieza_numero_inventario_int', 'letra', 'nombre_comun',
+    'nombre_atribuido', 'descripcion', 'funcion', 'forma', 'marcas_inscripciones', 'peso_kg', 'alto_cm', 'ancho_cm',
+    'profundidad_cm', 'diametro_cm', 'espesor_mm', 'estado_conservacion', 'row_hash',
+)
+COMPONENTE_FLOATS = ('peso_kg', 'alto_cm', 'ancho_cm', 'profundidad_cm', 'diametro_cm', 'espesor_mm')
+
+# (columna de la fila de pieza, label del nodo de dominio)
+DOMINIOS = (
+    ('autor', 'Autor'),
+    ('coleccion', 'Coleccion'),
+    ('filiacion_cultural', 'Cultura'),
+    ('pais', 'Pais'),
+    ('localidad', 'Localidad'),
+)
+
+# Cuerpo común para crear un componente `cr` (fila de _componente_rows) bajo la
+# pieza `p`. Los nodos Material/Tecnica ya existen (_create_domains).
+_COMPONENTE_CREATE = """
+        CREATE (c:Componente)
+        SET c = cr.props, c.dataset = $slot
+        CREATE (p)-[:TIENE_COMPONENTE]->(c)
+        WITH c, cr
+        CALL {
+          WITH c, cr
+          UNWIND cr.materiales AS v
+          MATCH (m:Material {dataset: $slot, nombre: v})
+          CREATE (c)-[:USO_MATERIAL]->(m)
+        }
+        CALL {
+          WITH c, cr
+          UNWIND cr.tecnicas AS v
+          MATCH (t:Tecnica {dataset: $slot, nombre: v})
+          CREATE (c)-[:USO_TECNICA]->(t)
+        }
+"""
+
+
+def _row_hashes(df):
+    """Hash por fila (columna -> valor) para detectar filas modificadas entre importaciones."""
+    cols = list(df.columns)
+    return [
+        hashlib.sha1(
+            json.dumps(dict(zip(cols, map(str, row))), ensure_ascii=False, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        for row in df.itertuples(index=False, name=None)
+    ]
+
+
+def _records(df):
+    """
+    Filas de `df` como dicts de strings, con el mismo formato que tenían los
+    CSV de LOAD CSV (celdas vacías -> None), para que las propiedades de los
+    nodos no cambien según el camino de carga.
+    """
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    buf.seek(0)
+    return [{k: (v if v != '' else None) for k, v in r.items()} for r in csv.DictReader(buf)]
+
+
+def _split(value):
+    """'madera; metal' -> ['madera', 'metal'] (sin vacíos ni repetidos)."""
+    return list(dict.fromkeys(v.strip() for v in (value or '').split(';') if v.strip()))
+
+
+def _componente_rows(comp_df):
+    rows = []
+    for r in _records(comp_df):
+        props = {k: r.get(k) for k in COMPONENTE_PROPS}
+        props['pieza_numero_inventario_int'] = int(r['pieza_numero_inventario'])
+        for k in COMPONENTE_FLOATS:
+            props[k] = float(props[k]) if props[k] is not None else None
+        rows.append({
+            'props': props,
+            'materiales': _split(r.get('materialidad')),
+            'tecnicas': _split(r.get('tecnica')),
+        })
+    return rows
+
+
+def _pieza_rows(piezas_df, comp_df):
+    """Filas de pieza listas para UNWIND, con sus componentes (de `comp_df`) anidados."""
+    por_pieza = {}
+    for cr in _componente_rows(comp_df):
+        por_pieza.setdefault(cr['props']['pieza_numero_inventario'], []).append(cr)
+
+    rows = []
+    for r in _records(piezas_df):
+        row = {
+            'props': {k: r.get(k) for k in PIEZA_PROPS},
+            'materiales': _split(r.get('materialidad')),
+            'tecnicas': _split(r.get('tecnica')),
+            'componentes': por_pieza.get(r['numero_inventario'], []),
+        }
+        row['props']['numero_inventario_int'] = int(r['numero_inventario_int'])
+        for col, _ in DOMINIOS:
+            row[col] = (r.get(col) or '').strip() or None
+            row[f'{col}_norm'] = r.get(f'{col}_norm')
+        rows.append(row)
+    return rows
+
+
+def _walk_images(root):
+    """
+    (ruta relativa con '/', DirEntry) de cada imagen bajo `root`, recorriendo
+    subcarpetas con os.scandir. Se saltan carpetas ocultas o que empiezan con '_'.
+    """
+    pendientes = ['']
+    while pendientes:
+        rel_dir = pendientes.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as it:
+            for entry in it:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir():
+                    if not entry.name.startswith(('.', '_')):
+                        pendientes.append(rel)
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower().lstrip('.') in IMAGE_EXTS:
+                    yield rel, entry
+
+
+def _file_hash(path, chunk_size=1 << 20):
+    """Hash del contenido de un archivo (blake2b de 128 bits, leído por bloques)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
 class Command(BaseCommand):
-    help = 'DROP + LOAD CSV de Excel e imágenes a Neo4j (espejo compat con dev-sqlite)'
+    help = 'Carga Excel e imágenes a Neo4j (UNWIND por Bolt) en el slot inactivo (blue/green) y cambio atómico del activo'
 
     def add_arguments(self, parser):
         parser.add_argument('--excel', required=True, help='Ruta Excel inventario (dentro del contenedor)')
         parser.add_argument('--images_dir', required=True, help='Carpeta imágenes (dentro del contenedor)')
+        parser.add_argument(
+            '--incremental', action='store_true',
+            help='No vacía el slot inactivo: compara hashes de filas e imágenes con lo que ya tiene, '
+                 'aplica sólo altas, cambios y bajas y lo publica'
+        )
+        parser.add_argument(
+            '--csv', action='store_true',
+            help='Además deja piezas.csv, componentes.csv e imagenes.csv en neo4j/import (la carga va por Bolt)'
+        )
+        parser.add_argument(
+            '--derivados', action='store_true',
+            help='Genera ahora las versiones web (thumb/medium/full) que falten, en vez de al primer request'
+        )
+        parser.add_argument(
+            '--dry_run', action='store_true',
+            help='Lee el Excel y la carpeta de imágenes e informa qué se cargaría, sin tocar Neo4j'
+        )
+        parser.add_argument(
+            '--excel_engine', choices=MOTORES, default='auto',
+            help='Lector del Excel: calamine (si está instalado) u openpyxl en modo read_only'
+        )
+        parser.add_argument(
+            '--sin_cache', action='store_true',
+            help='Vuelve a leer el Excel aunque ya esté en IMPORT_CACHE_DIR (y no lo guarda)'
+        )
+        parser.add_argument(
+            '--slot',
+            help='Carga completa en este slot sin publicarlo ni escribir los CSV auxiliares (lo usa bench_import)'
+        )
 
     def handle(self, *args, **opt):
-        t0 = time.monotonic()
+        t0 = self._t = time.monotonic()
+        self.timings = {}
         excel_path = opt['excel']
         images_dir = opt['images_dir']
+        incremental = opt['incremental']
+        publicar = not opt['slot']
+        if not publicar and opt['slot'] in SLOTS:
+            raise CommandError('--slot es para cargas fuera de blue/green')
 
         # Carpeta donde Neo4j puede leer CSV (montada como neo4j/import)
         import_dir = os.path.join(os.getcwd(), 'neo4j', 'import')
         os.makedirs(import_dir, exist_ok=True)
 
-        # 0) Wipe total
-        db.cypher_query("MATCH (n) DETACH DELETE n")
-
-        # 1) Excel
-        df = pd.read_excel(excel_path, header=1)
-
-        # El Excel suele traer dos columnas “fantasma”: la entre tipologia y coleccion (idx 10)
-        # y 'Unnamed: 46' (entre fecha_ingreso y responsable_coleccion). Las quitamos si existen.
-        to_drop = []
-        if len(df.columns) > 46:
-            to_drop = [df.columns[10], 'Unnamed: 46']
-        df.drop(columns=[c for c in to_drop if c in df.columns], inplace=True, errors='ignore')
+        # 1) Excel: sólo las columnas que se usan, ya limpio (sin columnas fantasma,
+        #    NaN rellenados, ordenado por número) y cacheado por hash de contenido
+        df, origen = leer_inventario(excel_path, opt['excel_engine'], cache=not opt['sin_cache'])
+        self.stdout.write(f"Excel: {len(df)} filas ({origen})")
+        self._lap('excel')
 
-        # Rellenar NaN según tipo
-        num_cols = df.select_dtypes(include=['int64','float64']).columns
-        obj_cols = df.select_dtypes(include=['object']).columns
-        df[num_cols] = df[num_cols].fillna(0)
-        df[obj_cols] = df[obj_cols].fillna("")
-
-        # Ordenar por número inventario (numérico)
-        df['__num'] = pd.to_numeric(df['numero_de_inventario'], errors='coerce')
-        df = df[df['__num'].notnull()]
-        df.sort_values('__num', inplace=True)
-
-        # 2) CSV base (SOLO piezas.csv + componentes.csv)
+        # 2) Tablas base (piezas + componentes), con hash por fila para el modo incremental
         piezas_cols = dict(
             numero_inventario='numero_de_inventario',
             revision='Revisión',
@@ -95,13 +273,18 @@ class Command(BaseCommand):
         piezas_df['numero_inventario_int'] = piezas_df['numero_inventario'].astype(int)
         # Evitar duplicados por filas A/B del Excel: quedarse con la primera (la “pieza”)
         piezas_df = piezas_df.drop_duplicates(subset=['numero_inventario'], keep='first')
-        piezas_csv = os.path.join(import_dir, 'piezas.csv')
-        piezas_df.to_csv(piezas_csv, index=False)
+        # Nombres normalizados igual que PiezaViewSet._parse_filters, para que la API
+        # filtre por índice (nombre_norm / tipologia_norm) sin toLower(trim()) al consultar
+        for col in ('autor', 'coleccion', 'pais', 'localidad', 'tipologia'):
+            if col in piezas_df.columns:
+                piezas_df[f'{col}_norm'] = piezas_df[col].astype(str).str.strip().str.lower()
+        piezas_df['row_hash'] = _row_hashes(piezas_df)
 
         # Componentes (una fila por letra, con marcas_inscripciones)
         comp_df = df[df['letra'].astype(str).str.strip() != ''].copy()
         comp_df = comp_df.assign(
             pieza_numero_inventario=comp_df['numero_de_inventario'].astype(int).astype(str),
+            pieza_numero_inventario_int=comp_df['numero_de_inventario'].astype(int),
             letra=comp_df['letra'].astype(str).str.strip().str.lower(),  # forzar minúscula para alinear con imágenes
             nombre_comun=comp_df['nombre_comun'],
             nombre_atribuido=comp_df['nombre_especifico'],
@@ -117,241 +300,123 @@ class Command(BaseCommand):
             espesor_mm=pd.to_numeric(comp_df.get('espesor_(mm)', 0), errors='coerce'),
             estado_conservacion=comp_df.get('estado_genral_de_conservacion', '')
         )[[
-            'pieza_numero_inventario', 'letra', 'nombre_comun', 'nombre_atribuido', 'descripcion',
-            'funcion', 'forma', 'marcas_inscripciones', 'peso_kg', 'alto_cm', 'ancho_cm',
-            'profundidad_cm', 'diametro_cm', 'espesor_mm', 'estado_conservacion', 'materialidad', 'tecnica'
+            'pieza_numero_inventario', 'pieza_numero_inventario_int', 'letra', 'nombre_comun',
+            'nombre_atribuido', 'descripcion', 'funcion', 'forma', 'marcas_inscripciones', 'peso_kg',
+            'alto_cm', 'ancho_cm', 'profundidad_cm', 'diametro_cm', 'espesor_mm', 'estado_conservacion',
+            'materialidad', 'tecnica'
         ]]
-        comp_csv = os.path.join(import_dir, 'componentes.csv')
-        comp_df.to_csv(comp_csv, index=False)
-
-        # 3) Índices / constraints mínimos
-        try:
-            db.cypher_query("DROP INDEX index_Pieza_numero_inventario IF EXISTS")
-        except Exception:
-            pass
-
-        db.cypher_query(
-            "CREATE CONSTRAINT unique_pieza_num IF NOT EXISTS "
-            "FOR (p:Pieza) REQUIRE p.numero_inventario IS UNIQUE"
-        )
-        for stmt in [
-            "CREATE INDEX idx_pieza_numint IF NOT EXISTS FOR (p:Pieza) ON (p.numero_inventario_int)",
-            "CREATE INDEX idx_comp_pieza_num IF NOT EXISTS FOR (c:Componente) ON (c.pieza_numero_inventario)",
-            "CREATE INDEX idx_comp_letra IF NOT EXISTS FOR (c:Componente) ON (c.letra)",
-            "CREATE INDEX idx_autor_nombre IF NOT EXISTS FOR (a:Autor) ON (a.nombre)",
-            "CREATE INDEX idx_pais_nombre IF NOT EXISTS FOR (pa:Pais) ON (pa.nombre)",
-            "CREATE INDEX idx_localidad_nombre IF NOT EXISTS FOR (l:Localidad) ON (l.nombre)",
-            "CREATE INDEX idx_cultura_nombre IF NOT EXISTS FOR (cu:Cultura) ON (cu.nombre)",
-            "CREATE INDEX idx_material_nombre IF NOT EXISTS FOR (m:Material) ON (m.nombre)",
-            "CREATE INDEX idx_tecnica_nombre IF NOT EXISTS FOR (t:Tecnica) ON (t.nombre)",
-            "CREATE INDEX idx_coleccion_nombre IF NOT EXISTS FOR (co:Coleccion) ON (co.nombre)",
-            "CREATE INDEX idx_expo_titulo IF NOT EXISTS FOR (e:Exposicion) ON (e.titulo)"
-        ]:
-            db.cypher_query(stmt)
-
-        # Unicidad por nombre de archivo de la imagen
-        db.cypher_query(
-            "CREATE CONSTRAINT uniq_imagen_file IF NOT EXISTS "
-            "FOR (i:Imagen) REQUIRE i.file_name IS UNIQUE"
-        )
+        comp_df['row_hash'] = _row_hashes(comp_df)
+        self._lap('tablas')
 
-        # 4) Carga de PIEZAS (propiedades planas)
-        db.cypher_query(f"""
-        CALL apoc.periodic.iterate(
-          "LOAD CSV WITH HEADERS FROM 'file:///piezas.csv' AS row RETURN row",
-          "
-           CREATE (p:Pieza {{
-             numero_inventario: row.numero_inventario,
-             numero_inventario_int: toInteger(row.numero_inventario_int),
-             revision: row.revision,
-             numero_registro_anterior: row.numero_registro_anterior,
-             codigo_surdoc: row.codigo_surdoc,
-             ubicacion: row.ubicacion,
-             deposito: row.deposito,
-             estante: row.estante,
-             caja_actual: row.caja_actual,
-             tipologia: row.tipologia,
-             clasificacion: row.clasificacion,
-             conjunto: row.conjunto,
-             nombre_comun: row.nombre_comun,
-             nombre_especifico: row.nombre_especifico,
-             fecha_creacion: row.fecha_creacion,
-             descripcion: row.descripcion,
-             marcas_inscripciones: row.marcas_inscripciones,
-             contexto_historico: row.contexto_historico,
-             bibliografia: row.bibliografia,
-             iconografia: row.iconografia,
-             notas_investigacion: row.notas_investigacion,
-             avaluo: row.avaluo,
-             procedencia: row.procedencia,
-             donante: row.donante,
-             fecha_ingreso: row.fecha_ingreso,
-             estado_conservacion: row.estado_conservacion,
-             descripcion_conservacion: row.descripcion_conservacion,
-             responsable_conservacion: row.responsable_conservacion,
-             fecha_actualizacion_conservacion: row.fecha_actualizacion_conservacion,
-             comentarios_conservacion: row.comentarios_conservacion,
-             responsable_coleccion: row.responsable_coleccion,
-             fecha_ultima_modificacion: row.fecha_ultima_modificacion
-           }})
-          ",
-          {{batchSize:1000, iterateList:true}}
-        )
-        """)
+        if opt['dry_run']:
+            self._dry_run(piezas_df, comp_df, images_dir)
+            return
 
-        # 5) Relacionar dominios (Autor/Colección/Cultura/País/Localidad) directamente desde piezas.csv
-        db.cypher_query("""
-        CALL apoc.periodic.iterate(
-          "LOAD CSV WITH HEADERS FROM 'file:///piezas.csv' AS row RETURN row",
-          "
-           MATCH (p:Pieza {numero_inventario:row.numero_inventario})
-
-           // Autor / Colección / Cultura
-           FOREACH (_ IN CASE WHEN row.autor<>'' THEN [1] ELSE [] END |
-             MERGE (a:Autor {nombre:trim(row.autor)}) MERGE (p)-[:CREADO_POR]->(a))
-           FOREACH (_ IN CASE WHEN row.coleccion<>'' THEN [1] ELSE [] END |
-             MERGE (c:Coleccion {nombre:trim(row.coleccion)}) MERGE (p)-[:PERTENECE_A]->(c))
-           FOREACH (_ IN CASE WHEN row.filiacion_cultural<>'' THEN [1] ELSE [] END |
-             MERGE (cu:Cultura {nombre:trim(row.filiacion_cultural)}) MERGE (p)-[:FILIACION]->(cu))
-
-           // País si existe
-           FOREACH (_ IN CASE WHEN row.pais<>'' THEN [1] ELSE [] END |
-             MERGE (pa:Pais {nombre:trim(row.pais)}) MERGE (p)-[:PROCEDENTE_DE]->(pa))
-
-           // Localidad si existe; y vincular a País si vino
-           FOREACH (_ IN CASE WHEN row.localidad<>'' THEN [1] ELSE [] END |
-             MERGE (l:Localidad {nombre:trim(row.localidad)})
-             MERGE (p)-[:LOCALIZADO_EN]->(l)
-             FOREACH (__ IN CASE WHEN row.pais<>'' THEN [1] ELSE [] END |
-               MERGE (pa:Pais {nombre:trim(row.pais)})
-               MERGE (l)-[:PERTENECE_A]->(pa)
-             )
-           )
-          ",
-          {batchSize:1000, iterateList:true}
-        )""")
+        # Slot destino: siempre el inactivo (la API sigue leyendo el activo hasta
+        # el cambio de puntero del final). El modo incremental no lo vacía: aplica
+        # el delta contra lo que ese slot ya tiene (la importación anterior a la
+        # activa, o nada), así que si falla a medias el dataset servido no cambia.
+        estado = current_dataset(refresh=True)
+        slot = opt['slot'] or inactive_slot(estado.slot)
+        self.stdout.write(f"Slot destino: {slot} (activo: {estado.slot or '-'})")
 
-        # 6) Relacionar materiales/técnicas de pieza desde strings ; separadas
-        for rel_name, label in [('materialidad','Material'), ('tecnica','Tecnica')]:
-            db.cypher_query(f"""
-            CALL apoc.periodic.iterate(
-              "LOAD CSV WITH HEADERS FROM 'file:///piezas.csv' AS row RETURN row",
-              "
-               MATCH (p:Pieza {{numero_inventario:row.numero_inventario}})
-               WITH p, row
-               CALL apoc.text.split(row.{rel_name}, ';') YIELD value
-               WITH p, trim(value) AS v
-               WHERE v <> ''
-               MERGE (m:{label} {{nombre:v}})
-               MERGE (p)-[:{'HECHO_DE' if label=='Material' else 'HECHO_CON'}]->(m)
-              ",
-              {{batchSize:1000, iterateList:true}}
+        # 3) Índices / constraints mínimos
+        self._create_schema()
+        self._lap('indices')
+
+        # 4)–9) Carga: todo en modo normal, o sólo lo que cambió en modo incremental.
+        # Los hashes guardados en el slot activo también sirven para no releer imágenes.
+        en_destino = self._stored_images(slot)
+        previas = dict(en_destino)
+        if estado.slot and estado.slot != slot:
+            previas.update(self._stored_images(estado.slot))
+        img_df = self._scan_images(images_dir, previas)
+        self._lap('escaneo_imagenes')
+        if incremental:
+            piezas_load, comp_load, img_load = self._apply_delta(
+                slot, piezas_df, comp_df, img_df, en_destino
             )
-            """)
+        else:
+            # Restos de la carga anterior en este slot (el que se usaría para volver atrás)
+            self._wipe_slot(slot)
+            piezas_load, comp_load, img_load = piezas_df, comp_df, img_df
+        self._lap('delta' if incremental else 'limpieza_slot')
+
+        if opt['csv']:
+            piezas_load.to_csv(os.path.join(import_dir, 'piezas.csv'), index=False)
+            comp_load.to_csv(os.path.join(import_dir, 'componentes.csv'), index=False)
+            img_load.to_csv(os.path.join(import_dir, 'imagenes.csv'), index=False)
+
+        # Los componentes de piezas (re)creadas van en el mismo lote que su pieza;
+        # en modo incremental puede haber componentes cambiados de piezas que no cambiaron.
+        con_pieza = comp_load['pieza_numero_inventario'].isin(piezas_load['numero_inventario'])
+        piezas_rows = _pieza_rows(piezas_load, comp_load[con_pieza])
+        sueltos_rows = _componente_rows(comp_load[~con_pieza])
+
+        # Cada valor de dominio se crea una sola vez; después las piezas sólo hacen MATCH
+        self._create_domains(slot, piezas_rows, sueltos_rows)
+        self._lap('dominios')
+        self._load_piezas(slot, piezas_rows)
+        self._load_componentes(slot, sueltos_rows)
+        self._lap('piezas_componentes')
+        self._load_imagenes(slot, img_load)
+        if incremental:
+            self._backfill_imagen_keys(slot)
+        self._lap('imagenes')
+        if opt['derivados']:
+            self._build_derivados(images_dir, img_df)
+            self._lap('derivados')
+        if incremental:
+            self._purge_orphan_domains(slot)
 
-        # 7) Componentes: nodos básicos
-        db.cypher_query("""
-        CALL apoc.periodic.iterate(
-          "LOAD CSV WITH HEADERS FROM 'file:///componentes.csv' AS row RETURN row",
-          "
-           CREATE (c:Componente {
-             pieza_numero_inventario: row.pieza_numero_inventario,
-             letra: row.letra,
-             nombre_comun: row.nombre_comun,
-             nombre_atribuido: row.nombre_atribuido,
-             descripcion: row.descripcion,
-             funcion: row.funcion,
-             forma: row.forma,
-             marcas_inscripciones: row.marcas_inscripciones,
-             peso_kg: toFloat(row.peso_kg),
-             alto_cm: toFloat(row.alto_cm),
-             ancho_cm: toFloat(row.ancho_cm),
-             profundidad_cm: toFloat(row.profundidad_cm),
-             diametro_cm: toFloat(row.diametro_cm),
-             espesor_mm: toFloat(row.espesor_mm),
-             estado_conservacion: row.estado_conservacion
-           })
-          ",
-          {batchSize:1000, iterateList:true}
-        )""")
-
-        # 8) Pieza -> Componente + M2M (materialidad/tecnica) del componente
-        db.cypher_query("""
-        CALL apoc.periodic.iterate(
-          "LOAD CSV WITH HEADERS FROM 'file:///componentes.csv' AS row RETURN row",
-          "
-           MATCH (p:Pieza {numero_inventario:row.pieza_numero_inventario})
-           MATCH (c:Componente {pieza_numero_inventario:row.pieza_numero_inventario, letra:row.letra})
-           MERGE (p)-[:TIENE_COMPONENTE]->(c)
-
-           // Materialidad del componente
-           WITH c, row
-           CALL apoc.text.split(row.materialidad, ';') YIELD value
-           WITH c, trim(value) AS mv, row
-           WHERE mv <> '' 
-           MERGE (m:Material {nombre:mv})
-           MERGE (c)-[:USO_MATERIAL]->(m)
-
-           // Técnica del componente
-           WITH c, row
-           CALL apoc.text.split(row.tecnica, ';') YIELD value
-           WITH c, trim(value) AS tv
-           WHERE tv <> '' 
-           MERGE (t:Tecnica {nombre:tv})
-           MERGE (c)-[:USO_TECNICA]->(t)
-          ",
-          {batchSize:1000, iterateList:true}
-        )""")
+        # ===== CSV auxiliares para filtros del frontend =====
+        # (sólo al publicar: describen el dataset que va a leer la API)
+        if publicar:
+            self._write_aux(piezas_df, img_df, import_dir)  # los dejamos junto a los otros csv
+
+        # 10) Validar el slot y publicarlo (también en modo incremental). Si algo
+        #     no cuadra, el puntero no se mueve y la API sigue en el slot anterior.
+        #     Una nueva versión invalida cachés y ETag de la API. Con --slot sólo se valida.
+        self._validate_slot(slot, piezas_df, comp_df, img_df)
+        if publicar:
+            activate(slot)
+            self._purge_legacy()
+        self._lap('publicacion')
+
+        self.stdout.write(" | ".join(f"{k} {v:.2f}s" for k, v in self.timings.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Import finalizado en slot {slot}: {len(piezas_df)} piezas, {len(img_df)} imágenes, "
+            f"en {time.monotonic()-t0:.2f}s"
+        ))
 
-        # 9) Imágenes: escanear carpeta, normalizar letra a minúscula y vincular
-        img_rows = []
-        for fn in os.listdir(images_dir):
-            full = os.path.join(images_dir, fn)
-            if not os.path.isfile(full):
-                continue
-            name, ext = os.path.splitext(fn)
-            ext = ext.lower().lstrip('.')
-            if ext not in ('jpg', 'jpeg', 'png', 'tif', 'tiff'):
-                continue
-            m = re.match(r'^0*(\d+)([A-Za-z]?)(?:.*)$', name)
+    def _dry_run(self, piezas_df, comp_df, images_dir):
+        """--dry_run: lo que se cargaría, sin conectarse a Neo4j ni hashear imágenes."""
+        nums = set(piezas_df['numero_inventario'])
+        comps = set(zip(comp_df['pieza_numero_inventario'], comp_df['letra']))
+        imagenes = sin_pieza = sin_componente = 0
+        for _, entry in _walk_images(images_dir):
+            m = IMAGE_RE.match(os.path.splitext(entry.name)[0])
             if not m:
                 continue
-            num = str(int(m.group(1)))
-            letra = (m.group(2) or '').lower()
-            img_rows.append({'file_name': fn, 'num': num, 'letra': letra})
-
-        pd.DataFrame(img_rows).to_csv(os.path.join(import_dir, 'imagenes.csv'), index=False)
-
-        # Nodos Imagen
-        db.cypher_query("""
-        LOAD CSV WITH HEADERS FROM 'file:///imagenes.csv' AS row
-        WITH row WHERE row.file_name IS NOT NULL AND trim(row.file_name) <> ''
-        MERGE (:Imagen {file_name: trim(row.file_name)});
-        """)
-
-        # Pieza -> Imagen
-        db.cypher_query("""
-        LOAD CSV WITH HEADERS FROM 'file:///imagenes.csv' AS row
-        WITH trim(row.num) AS num, trim(row.file_name) AS fn
-        MATCH (p:Pieza {numero_inventario: num})
-        MATCH (i:Imagen {file_name: fn})
-        MERGE (p)-[:TIENE_IMAGEN]->(i);
-        """)
-
-        # Componente -> Imagen (si hay letra)
-        db.cypher_query("""
-        LOAD CSV WITH HEADERS FROM 'file:///imagenes.csv' AS row
-        WITH trim(row.num) AS num, toLower(trim(coalesce(row.letra,''))) AS letra, trim(row.file_name) AS fn
-        WHERE letra <> ''
-        MATCH (c:Componente {pieza_numero_inventario: num, letra: letra})
-        MATCH (i:Imagen {file_name: fn})
-        MERGE (c)-[:TIENE_IMAGEN]->(i);
-        """)
-
-
-        # ===== CSV auxiliares para filtros del frontend =====
-        aux_dir = import_dir  # los dejamos junto a los otros csv
+            imagenes += 1
+            num, letra = str(int(m.group(1))), (m.group(2) or '').lower()
+            if num not in nums:
+                sin_pieza += 1
+            elif letra and (num, letra) not in comps:
+                sin_componente += 1
+        self._lap('escaneo_imagenes')
+
+        self.stdout.write(" | ".join(f"{k} {v:.2f}s" for k, v in self.timings.items()))
+        self.stdout.write(
+            f"Se cargarían {len(piezas_df)} piezas, {len(comp_df)} componentes y {imagenes} imágenes "
+            f"({sin_pieza} sin pieza y {sin_componente} sin componente en el Excel)"
+        )
+        if not len(piezas_df):
+            raise CommandError('El Excel no trae piezas')
+        self.stdout.write(self.style.SUCCESS("✅ Dry run: no se modificó Neo4j"))
 
+    def _write_aux(self, piezas_df, img_df, aux_dir):
+        """CSV auxiliares para filtros del frontend (y reporte de imágenes duplicadas)."""
         def _norm(s: str) -> str:
             # Normaliza: quita espacios, aplica NFC y casefold (mejor que lower para Unicode)
             s = (s or "").strip()
@@ -390,6 +455,374 @@ class Command(BaseCommand):
         pd.DataFrame({"nombre": _uniq_series(piezas_df.get("tipologia", pd.Series(dtype=str)))}) \
           .to_csv(os.path.join(aux_dir, "tipologias.csv"), index=False)
 
-        self.stdout.write(self.style.SUCCESS(
-            f"✅ Import finalizado: {len(piezas_df)} piezas, {len(img_rows)} imágenes, en {time.monotonic()-t0:.2f}s"
-        ))
+        self._report_duplicates(img_df, aux_dir)
+
+    def _lap(self, etapa):
+        """Acumula en self.timings el tiempo transcurrido desde la etapa anterior."""
+        now = time.monotonic()
+        self.timings[etapa] = self.timings.get(etapa, 0.0) + now - self._t
+        self._t = now
+
+    def _create_schema(self):
+        """Constraints e índices que usan la carga y la API (idempotente)."""
+        try:
+            db.cypher_query("DROP INDEX index_Pieza_numero_inventario IF EXISTS")
+        except Exception:
+            pass
+
+        # Con dos slots un mismo número/archivo existe dos veces: la unicidad es por slot
+        for stmt in [
+            "DROP CONSTRAINT unique_pieza_num IF EXISTS",
+            "DROP CONSTRAINT uniq_imagen_file IF EXISTS",
+            "CREATE CONSTRAINT unique_pieza_dataset_num IF NOT EXISTS "
+            "FOR (p:Pieza) REQUIRE (p.dataset, p.numero_inventario) IS UNIQUE",
+            "CREATE CONSTRAINT uniq_imagen_dataset_file IF NOT EXISTS "
+            "FOR (i:Imagen) REQUIRE (i.dataset, i.file_name) IS UNIQUE",
+            "CREATE CONSTRAINT uniq_imagen_dataset_uid IF NOT EXISTS "
+            "FOR (i:Imagen) REQUIRE (i.dataset, i.uid) IS UNIQUE",
+        ]:
+            db.cypher_query(stmt)
+        for stmt in [
+            "CREATE INDEX idx_pieza_numint IF NOT EXISTS FOR (p:Pieza) ON (p.numero_inventario_int)",
+            "CREATE INDEX idx_pieza_dataset_numint IF NOT EXISTS FOR (p:Pieza) ON (p.dataset, p.numero_inventario_int)",
+            "CREATE INDEX idx_comp_dataset_pieza_letra IF NOT EXISTS "
+            "FOR (c:Componente) ON (c.dataset, c.pieza_numero_inventario, c.letra)",
+            # Orden de /api/componentes/
+            "CREATE INDEX idx_comp_dataset_numint_letra IF NOT EXISTS "
+            "FOR (c:Componente) ON (c.dataset, c.pieza_numero_inventario_int, c.letra)",
+            "CREATE INDEX idx_imagen_dataset_hash IF NOT EXISTS FOR (i:Imagen) ON (i.dataset, i.file_hash)",
+            "CREATE INDEX idx_imagen_dataset_key IF NOT EXISTS FOR (i:Imagen) ON (i.dataset, i.file_name_key)",
+            "CREATE INDEX idx_comp_pieza_num IF NOT EXISTS FOR (c:Componente) ON (c.pieza_numero_inventario)",
+            "CREATE INDEX idx_comp_letra IF NOT EXISTS FOR (c:Componente) ON (c.letra)",
+            "CREATE INDEX idx_autor_nombre IF NOT EXISTS FOR (a:Autor) ON (a.nombre)",
+            "CREATE INDEX idx_pais_nombre IF NOT EXISTS FOR (pa:Pais) ON (pa.nombre)",
+            "CREATE INDEX idx_localidad_nombre IF NOT EXISTS FOR (l:Localidad) ON (l.nombre)",
+            "CREATE INDEX idx_cultura_nombre IF NOT EXISTS FOR (cu:Cultura) ON (cu.nombre)",
+            "CREATE INDEX idx_material_nombre IF NOT EXISTS FOR (m:Material) ON (m.nombre)",
+            "CREATE INDEX idx_tecnica_nombre IF NOT EXISTS FOR (t:Tecnica) ON (t.nombre)",
+            "CREATE INDEX idx_coleccion_nombre IF NOT EXISTS FOR (co:Coleccion) ON (co.nombre)",
+            "CREATE INDEX idx_autor_nombre_norm IF NOT EXISTS FOR (a:Autor) ON (a.nombre_norm)",
+            "CREATE INDEX idx_pais_nombre_norm IF NOT EXISTS FOR (pa:Pais) ON (pa.nombre_norm)",
+            "CREATE INDEX idx_localidad_nombre_norm IF NOT EXISTS FOR (l:Localidad) ON (l.nombre_norm)",
+            "CREATE INDEX idx_coleccion_nombre_norm IF NOT EXISTS FOR (co:Coleccion) ON (co.nombre_norm)",
+            "CREATE INDEX idx_pieza_tipologia_norm IF NOT EXISTS FOR (p:Pieza) ON (p.tipologia_norm)",
+            "CREATE INDEX idx_expo_titulo IF NOT EXISTS FOR (e:Exposicion) ON (e.titulo)",
+            # Búsqueda de texto libre (?q= de /api/piezas/), sin distinguir tildes
+            CREATE_INDICE_TEXTO,
+        ]:
+            db.cypher_query(stmt)
+        for label in ('Autor', 'Pais', 'Localidad', 'Cultura', 'Material', 'Tecnica', 'Coleccion'):
+            db.cypher_query(
+                f"CREATE INDEX idx_{label.lower()}_dataset_nombre IF NOT EXISTS "
+                f"FOR (n:{label}) ON (n.dataset, n.nombre)"
+            )
+
+    def _wipe_slot(self, slot):
+        """Borra (por lotes) lo que quedó en `slot` de una importación anterior."""
+        db.cypher_query("""
+        CALL apoc.periodic.iterate(
+          "MATCH (n) WHERE n.dataset = $slot RETURN n",
+          "DETACH DELETE n",
+          {batchSize:1000, params:{slot:$slot}}
+        )""", {'slot': slot})
+
+    def _purge_legacy(self):
+        """Nodos de importaciones previas a blue/green (sin `dataset`): ya no los lee la API."""
+        db.cypher_query("""
+        CALL apoc.periodic.iterate(
+          "MATCH (n) WHERE n.dataset IS NULL AND NOT n:Dataset RETURN n",
+          "DETACH DELETE n",
+          {batchSize:1000}
+        )""")
+
+    def _validate_slot(self, slot, piezas_df, comp_df, img_df):
+        """Compara lo que quedó en el slot con lo que traía el Excel / la carpeta."""
+        rows, _ = db.cypher_query("""
+        CALL { MATCH (p:Pieza) WHERE p.dataset = $slot RETURN count(p) AS piezas }
+        CALL { MATCH (c:Componente) WHERE c.dataset = $slot RETURN count(c) AS componentes }
+        CALL { MATCH (i:Imagen) WHERE i.dataset = $slot RETURN count(i) AS imagenes }
+        RETURN piezas, componentes, imagenes
+        """, {'slot': slot})
+        cargado = dict(zip(('piezas', 'componentes', 'imagenes'), rows[0]))
+        esperado = {'piezas': len(piezas_df), 'componentes': len(comp_df), 'imagenes': len(img_df)}
+        if not esperado['piezas']:
+            raise CommandError('El Excel no trae piezas; no se publica el slot ' + slot)
+        if cargado != esperado:
+            raise CommandError(
+                f"Validación del slot {slot} falló (esperado {esperado}, cargado {cargado})"
+            )
+
+    def _stored_images(self, slot):
+        """file_name -> (file_hash, file_size, file_mtime) de las imágenes ya cargadas en `slot`."""
+        if not slot:
+            return {}
+        rows, _ = db.cypher_query(
+            "MATCH (i:Imagen) WHERE i.dataset = $slot "
+            "RETURN i.file_name, i.file_hash, i.file_size, i.file_mtime", {'slot': slot}
+        )
+        return {fn: (h, size, mtime) for fn, h, size, mtime in rows}
+
+    def _scan_images(self, images_dir, previas):
+        """
+        9) Imágenes: escanear la carpeta (y subcarpetas), normalizar letra a
+        minúscula y hashear el contenido en paralelo. Si tamaño y mtime coinciden
+        con lo guardado en `previas` se reutiliza el hash sin leer el archivo.
+        """
+        img_rows, paths = [], []
+        for rel, entry in _walk_images(images_dir):
+            m = IMAGE_RE.match(os.path.splitext(entry.name)[0])
+            if not m:
+                continue
+            st = entry.stat()
+            h, size, mtime = previas.get(rel, (None, None, None))
+            img_rows.append({
+                'file_name': rel,
+                'num': str(int(m.group(1))),
+                'letra': (m.group(2) or '').lower(),
+                'file_hash': h if (size, mtime) == (st.st_size, st.st_mtime) else None,
+                'file_size': st.st_size,
+                'file_mtime': st.st_mtime,
+            })
+            paths.append(entry.path)
+
+        pendientes = [i for i, r in enumerate(img_rows) if not r['file_hash']]
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            for i, h in zip(pendientes, pool.map(_file_hash, [paths[i] for i in pendientes])):
+                img_rows[i]['file_hash'] = h
+        self.stdout.write(f"Imágenes: {len(img_rows)} ({len(pendientes)} hasheadas, el resto sin cambios)")
+
+        return pd.DataFrame(img_rows, columns=IMAGE_COLS)
+
+    def _build_derivados(self, images_dir, img_df):
+        """Versiones web de todas las imágenes (api/derivados.py); las ya generadas se saltan."""
+        items = [
+            (os.path.join(images_dir, fn), h)
+            for fn, h in img_df[['file_name', 'file_hash']].drop_duplicates('file_hash').itertuples(index=False)
+        ]
+        escritos, errores = generar_lote(items)
+        self.stdout.write(f"Derivados: {escritos} archivos nuevos para {len(items)} imágenes")
+        for err in errores[:20]:
+            self.stdout.write(self.style.WARNING(f"⚠️  {err}"))
+        if len(errores) > 20:
+            self.stdout.write(self.style.WARNING(f"⚠️  ... y {len(errores) - 20} más"))
+
+    def _report_duplicates(self, img_df, aux_dir):
+        """Imágenes con el mismo contenido asociadas a distintos números de inventario."""
+        dup = img_df[img_df.duplicated('file_hash', keep=False)]
+        dup = dup[dup.groupby('file_hash')['num'].transform('nunique') > 1]
+        dup.sort_values(['file_hash', 'file_name'])[['file_hash', 'file_name', 'num', 'letra']] \
+           .to_csv(os.path.join(aux_dir, 'imagenes_duplicadas.csv'), index=False)
+        if len(dup):
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  {len(dup)} imágenes repiten contenido entre números de inventario "
+                f"(ver imagenes_duplicadas.csv)"
+            ))
+
+    def _apply_delta(self, slot, piezas_df, comp_df, img_df, old_i):
+        """
+        Modo incremental: compara los hashes recién calculados con los guardados
+        en los nodos, borra lo que desapareció o cambió y devuelve sólo las filas
+        que hay que (re)crear. Una pieza modificada se recrea con todos sus
+        componentes; las imágenes se re-vinculan si su pieza/componente se recreó.
+        `old_i` es lo que devolvió _stored_images para el slot.
+        """
+        params = {'slot': slot}
+        rows, _ = db.cypher_query(
+            "MATCH (p:Pieza) WHERE p.dataset = $slot RETURN p.numero_inventario, p.row_hash", params
+        )
+        old_p = dict(rows)
+        new_p = dict(zip(piezas_df['numero_inventario'], piezas_df['row_hash']))
+        bajas_p = [n for n in old_p if n not in new_p]
+        altas_p = [n for n in new_p if n not in old_p]
+        cambios_p = [n for n, h in new_p.items() if n in old_p and old_p[n] != h]
+        recrear_p = set(altas_p) | set(cambios_p)
+
+        rows, _ = db.cypher_query(
+            "MATCH (c:Componente) WHERE c.dataset = $slot "
+            "RETURN c.pieza_numero_inventario, c.letra, c.row_hash", params
+        )
+        old_c = {(n, l): h for n, l, h in rows}
+        comp_keys = list(zip(comp_df['pieza_numero_inventario'], comp_df['letra']))
+        new_c = dict(zip(comp_keys, comp_df['row_hash']))
+        recrear_c = {k for k, h in new_c.items() if k[0] in recrear_p or old_c.get(k) != h}
+        # Los componentes de piezas borradas/recreadas caen junto con la pieza
+        piezas_fuera = set(bajas_p) | set(cambios_p)
+        bajas_c = [
+            list(k) for k in old_c
+            if k[0] not in piezas_fuera and (k not in new_c or k in recrear_c)
+        ]
+
+        en_disco = set(img_df['file_name'])
+        bajas_i = [f for f in old_i if f not in en_disco]
+        img_mask = [
+            old_i.get(fn) != (h, size, mtime) or num in recrear_p or (num, letra) in recrear_c
+            for fn, num, letra, h, size, mtime in img_df[IMAGE_COLS].itertuples(index=False)
+        ]
+
+        if piezas_fuera:
+            db.cypher_query("""
+            UNWIND $nums AS num
+            MATCH (p:Pieza {dataset: $slot, numero_inventario: num})
+            DETACH DELETE p
+            """, dict(params, nums=list(piezas_fuera)))
+            db.cypher_query("""
+            MATCH (c:Componente) WHERE c.dataset = $slot AND c.pieza_numero_inventario IN $nums
+            DETACH DELETE c
+            """, dict(params, nums=list(piezas_fuera)))
+        if bajas_c:
+            db.cypher_query("""
+            UNWIND $keys AS k
+            MATCH (c:Componente {dataset: $slot, pieza_numero_inventario: k[0], letra: k[1]})
+            DETACH DELETE c
+            """, dict(params, keys=bajas_c))
+        if bajas_i:
+            db.cypher_query("""
+            MATCH (i:Imagen) WHERE i.dataset = $slot AND i.file_name IN $names
+            DETACH DELETE i
+            """, dict(params, names=bajas_i))
+        self.stdout.write(
+            f"Δ piezas: +{len(altas_p)} ~{len(cambios_p)} -{len(bajas_p)} | "
+            f"componentes: ~{len(recrear_c)} -{len(bajas_c)} | "
+            f"imágenes: ~{sum(img_mask)} -{len(bajas_i)}"
+        )
+        comp_mask = pd.Series([k in recrear_c for k in comp_keys], index=comp_df.index, dtype=bool)
+        return (
+            piezas_df[piezas_df['numero_inventario'].isin(recrear_p)],
+            comp_df[comp_mask],
+            img_df[pd.Series(img_mask, index=img_df.index, dtype=bool)],
+        )
+
+    def _purge_orphan_domains(self, slot):
+        """Quita nodos de dominio del slot que quedaron sin piezas/componentes tras un delta."""
+        db.cypher_query("""
+        MATCH (n) WHERE (n:Autor OR n:Coleccion OR n:Cultura OR n:Localidad OR n:Material OR n:Tecnica)
+          AND n.dataset = $slot AND NOT EXISTS { ()-->(n) }
+        DETACH DELETE n
+        """, {'slot': slot})
+        db.cypher_query("""
+        MATCH (n:Pais) WHERE n.dataset = $slot AND NOT EXISTS { ()-->(n) }
+        DETACH DELETE n
+        """, {'slot': slot})
+
+    def _run_batches(self, query, rows, slot):
+        """Ejecuta `query` (que consume `$rows`) en lotes de BATCH_SIZE, una transacción por lote."""
+        for start in range(0, len(rows), BATCH_SIZE):
+            db.cypher_query(query, {'rows': rows[start:start + BATCH_SIZE], 'slot': slot})
+
+    def _create_domains(self, slot, piezas_rows, sueltos_rows):
+        """
+        Nodos de dominio (Autor, Colección, ..., Material, Técnica) de las filas
+        a cargar: un MERGE por valor distinto, en vez de uno por fila. También
+        vincula cada Localidad con su País.
+        """
+        nombres = {label: {} for _, label in DOMINIOS + (('', 'Material'), ('', 'Tecnica'))}
+        pares = set()
+        componentes = list(sueltos_rows)
+        for row in piezas_rows:
+            for col, label in DOMINIOS:
+                if row[col]:
+                    nombres[label].setdefault(row[col], row[f'{col}_norm'])
+            if row['localidad'] and row['pais']:
+                pares.add((row['localidad'], row['pais']))
+            componentes.extend(row['componentes'])
+        for row in list(piezas_rows) + componentes:
+            for v in row['materiales']:
+                nombres['Material'].setdefault(v, None)
+            for v in row['tecnicas']:
+                nombres['Tecnica'].setdefault(v, None)
+
+        for label, vals in nombres.items():
+            self._run_batches(f"""
+            UNWIND $rows AS r
+            MERGE (n:{label} {{dataset: $slot, nombre: r.nombre}})
+            ON CREATE SET n.nombre_norm = r.norm
+            """, [{'nombre': k, 'norm': v} for k, v in vals.items()], slot)
+
+        self._run_batches("""
+        UNWIND $rows AS r
+        MATCH (l:Localidad {dataset: $slot, nombre: r[0]})
+        MATCH (pa:Pais {dataset: $slot, nombre: r[1]})
+        MERGE (l)-[:PERTENECE_A]->(pa)
+        """, [list(par) for par in pares], slot)
+
+    def _load_piezas(self, slot, rows):
+        """4)–8) Piezas con sus vínculos a dominios, materiales/técnicas y componentes, un paso por lote."""
+        self._run_batches(f"""
+        UNWIND $rows AS row
+        CREATE (p:Pieza)
+        SET p = row.props, p.dataset = $slot
+        WITH p, row
+
+        // Autor / Colección / Cultura / País / Localidad (un nodo por valor, o ninguno)
+        CALL {{ WITH p, row MATCH (x:Autor {{dataset: $slot, nombre: row.autor}}) CREATE (p)-[:CREADO_POR]->(x) }}
+        CALL {{ WITH p, row MATCH (x:Coleccion {{dataset: $slot, nombre: row.coleccion}}) CREATE (p)-[:PERTENECE_A]->(x) }}
+        CALL {{ WITH p, row MATCH (x:Cultura {{dataset: $slot, nombre: row.filiacion_cultural}}) CREATE (p)-[:FILIACION]->(x) }}
+        CALL {{ WITH p, row MATCH (x:Pais {{dataset: $slot, nombre: row.pais}}) CREATE (p)-[:PROCEDENTE_DE]->(x) }}
+        CALL {{ WITH p, row MATCH (x:Localidad {{dataset: $slot, nombre: row.localidad}}) CREATE (p)-[:LOCALIZADO_EN]->(x) }}
+
+        // Materiales / técnicas de la pieza
+        CALL {{
+          WITH p, row
+          UNWIND row.materiales AS v
+          MATCH (m:Material {{dataset: $slot, nombre: v}})
+          CREATE (p)-[:HECHO_DE]->(m)
+        }}
+        CALL {{
+          WITH p, row
+          UNWIND row.tecnicas AS v
+          MATCH (t:Tecnica {{dataset: $slot, nombre: v}})
+          CREATE (p)-[:HECHO_CON]->(t)
+        }}
+
+        // Componentes de la pieza
+        CALL {{
+          WITH p, row
+          UNWIND row.componentes AS cr
+          {_COMPONENTE_CREATE}
+        }}
+        """, rows, slot)
+
+    def _load_componentes(self, slot, rows):
+        """Componentes cuya pieza ya está en el grafo (modo incremental)."""
+        self._run_batches(f"""
+        UNWIND $rows AS cr
+        MATCH (p:Pieza {{dataset: $slot, numero_inventario: cr.props.pieza_numero_inventario}})
+        {_COMPONENTE_CREATE}
+        """, rows, slot)
+
+    def _backfill_imagen_keys(self, slot):
+        """uid/file_name_key para imágenes sin cambios cargadas antes de que existieran."""
+        rows, _ = db.cypher_query(
+            "MATCH (i:Imagen) WHERE i.dataset = $slot AND (i.uid IS NULL OR i.file_name_key IS NULL) "
+            "RETURN i.file_name", {'slot': slot}
+        )
+        rows = [
+            {'file_name': fn, 'uid': imagen_uid(fn), 'file_name_key': fn.casefold()}
+            for (fn,) in rows if fn
+        ]
+        self._run_batches("""
+        UNWIND $rows AS row
+        MATCH (i:Imagen {dataset: $slot, file_name: row.file_name})
+        SET i.uid = row.uid, i.file_name_key = row.file_name_key
+        """, rows, slot)
+
+    def _load_imagenes(self, slot, img_df):
+        """Nodos Imagen y vínculos con piezas/componentes (la letra ya viene en minúscula)."""
+        rows = img_df[IMAGE_COLS].to_dict('records')
+        for row in rows:
+            row['file_name'] = row['file_name'].strip()
+            row['uid'] = imagen_uid(row['file_name'])
+            row['file_name_key'] = row['file_name'].casefold()
+        self._run_batches("""
+        UNWIND $rows AS row
+        MERGE (i:Imagen {dataset: $slot, file_name: row.file_name})
+        SET i.file_hash = row.file_hash, i.file_size = row.file_size, i.file_mtime = row.file_mtime,
+            i.uid = row.uid, i.file_name_key = row.file_name_key
+        WITH i, row
+        OPTIONAL MATCH (p:Pieza {dataset: $slot, numero_inventario: row.num})
+        FOREACH (_ IN CASE WHEN p IS NULL THEN [] ELSE [1] END | MERGE (p)-[:TIENE_IMAGEN]->(i))
+        WITH i, row
+        OPTIONAL MATCH (c:Componente {dataset: $slot, pieza_numero_inventario: row.num, letra: row.letra})
+        WHERE row.letra <> ''
+        FOREACH (_ IN CASE WHEN c IS NULL THEN [] ELSE [1] END | MERGE (c)-[:TIENE_IMAGEN]->(i))
+        """, rows, slot)
@@ -3,11 +3,11 @@
 import os
 import re
 import time
-import pandas as pd
 from pathlib import Path
 from django.core.management.base import BaseCommand
 from django.db import connection
 from django.core.management.color import no_style
+from api.management.commands._excel import leer_inventario
 from api.models import (
     Pieza, Componente, Imagen,
     Pais, Localidad, Cultura,
@@ -59,30 +59,10 @@ class Command(BaseCommand):
             for sql in seq_sql:
                 cursor.execute(sql)
 
-        # ─── 3) Leer y limpiar Excel ─────────────────────────────────
-        df = pd.read_excel(excel_path, header=1)
-        # print("=== Tipos antes de fillna ===")
-        # print(df.dtypes)
-        # print(df.info())
-        # df.fillna("", inplace=True)
-        # 3.1) Eliminar las dos columnas vacías que sobran, la que está entre "tipologia" y "coleccion", y la que se llama 'Unnamed: 46' (entre "fecha_ingreso" y "responsable_coleccion").
-        #    - columna sin nombre (índice 10 en el df.dtypes)
-        #    - 'Unnamed: 46' (índice 46)
-        to_drop = [df.columns[10], 'Unnamed: 46']
-        df.drop(columns=to_drop, inplace=True, errors='ignore')
-
-        # 3.2) Rellenar NaN solo en función del tipo de dato
-        num_cols = df.select_dtypes(include=['int64','float64']).columns
-        obj_cols = df.select_dtypes(include=['object']).columns
-        df[num_cols] = df[num_cols].fillna(0)
-        df[obj_cols] = df[obj_cols].fillna("")
-
-        # ─── 4) Ordenar numéricamente por numero_de_inventario ───────
-        df['__num'] = pd.to_numeric(df['numero_de_inventario'], errors='coerce')
-        df = df[df['__num'].notnull()]
-        df.sort_values(by='__num', inplace=True)
-        df['numero_de_inventario'] = df['__num'].astype(int).astype(str)
-        df.drop(columns='__num', inplace=True)
+        # ─── 3–4) Leer y limpiar Excel (sin columnas fantasma, NaN rellenados,
+        #          ordenado por numero_de_inventario; ver _excel.py) ──────
+        df, origen = leer_inventario(excel_path)
+        self.stdout.write(f"Excel: {len(df)} filas ({origen})")
 
         # ─── 5) Preparar caches para get_or_create ────────────────────
         pais_cache      = {}
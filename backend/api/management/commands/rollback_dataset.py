@@ -0,0 +1,26 @@
+# backend/api/management/commands/rollback_dataset.py
+from django.core.management.base import BaseCommand, CommandError
+from neomodel import db
+
+from api.dataset import activate, current_dataset
+
+
+class Command(BaseCommand):
+    help = 'Vuelve la API al dataset (slot blue/green) anterior a la última importación completa'
+
+    def handle(self, *args, **opt):
+        estado = current_dataset(refresh=True)
+        anterior = estado.previous_slot
+        if not anterior:
+            raise CommandError('No hay un dataset anterior al que volver')
+
+        rows, _ = db.cypher_query(
+            "MATCH (p:Pieza) WHERE p.dataset = $slot RETURN count(p)", {'slot': anterior}
+        )
+        if not rows[0][0]:
+            raise CommandError(f'El slot {anterior} está vacío; no se cambia el dataset activo')
+
+        activate(anterior)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Dataset activo: {anterior} ({rows[0][0]} piezas); el anterior ({estado.slot}) queda disponible"
+        ))
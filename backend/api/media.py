@@ -0,0 +1,223 @@
+# api/media.py
+"""
+Entrega de archivos de MEDIA_ROOT (imágenes originales y derivados).
+
+Según MEDIA_SERVE_MODE:
+- 'django': Django responde el archivo con FileResponse (el servidor WSGI
+  puede usar sendfile vía wsgi.file_wrapper) y atiende `Range` de un tramo.
+- 'x-accel': nginx entrega el archivo (cabecera X-Accel-Redirect hacia una
+  location `internal` que apunta a MEDIA_ROOT, ver MEDIA_ACCEL_PREFIX).
+- 'x-sendfile': Apache/lighttpd entregan el archivo (cabecera X-Sendfile).
+
+En todos los modos Django resuelve antes el GET condicional (ETag /
+If-None-Match, Last-Modified) y fija Cache-Control: los derivados y los
+originales pedidos con el `?v=<hash>` vigente son inmutables.
+
+El hash de cada original sale de `hashes_imagenes`: un dict en memoria
+file_name -> (hash, tamaño, mtime) que se arma con una sola consulta por
+versión del dataset, así servir una imagen no consulta Neo4j cada vez.
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .dataset import current_dataset
+from .neo import read_query
+
+logger = logging.getLogger(__name__)
+
+CACHE_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_REVALIDAR = 'no-cache'
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _Tramo:
+    """Vista de sólo lectura de `length` bytes de un archivo ya posicionado (para 206)."""
+
+    def __init__(self, f, length):
+        self._f = f
+        self._restante = length
+
+    def read(self, size=-1):
+        if self._restante <= 0:
+            return b''
+        size = self._restante if size < 0 else min(size, self._restante)
+        data = self._f.read(size)
+        self._restante -= len(data)
+        return data
+
+    def fileno(self):
+        # Permite sendfile desde la posición actual (el servidor respeta Content-Length)
+        return self._f.fileno()
+
+    def close(self):
+        self._f.close()
+
+
+def _parse_range(header, size):
+    """
+    (inicio, fin) inclusivos de un `Range: bytes=` de un solo tramo. None si
+    la cabecera no aplica (se responde el archivo completo); ValueError si el
+    tramo no es satisfacible.
+    """
+    m = _RANGE_RE.match(header.strip())
+    if not m or m.groups() == ('', ''):
+        return None
+    ini, fin = m.groups()
+    if ini:
+        start = int(ini)
+        if fin and int(fin) < start:
+            return None
+        end = min(int(fin), size - 1) if fin else size - 1
+    else:
+        n = int(fin)
+        if n == 0:
+            raise ValueError(header)
+        start, end = max(0, size - n), size - 1
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def imagen_uid(file_name):
+    """
+    Id de una imagen en la API: se deriva de su ruta, así que no cambia entre
+    importaciones ni al pasar de un slot a otro (ver Imagen.uid).
+    """
+    return hashlib.blake2b(file_name.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def media_url(file_name, file_hash=None, request=None):
+    """URL del original; con hash lleva `?v=` para que el navegador la cachee sin revalidar."""
+    rel = f"{settings.MEDIA_URL}{file_name}"
+    if file_hash:
+        rel += f"?v={file_hash[:16]}"
+    return request.build_absolute_uri(rel) if request else rel
+
+
+_hashes = {}
+_hashes_lock = threading.Lock()
+# Tras un error de Neo4j no se reintenta hasta este instante (time.monotonic)
+_sin_neo4j_hasta = [0.0]
+
+
+def hashes_imagenes(version, slot):
+    """file_name -> (file_hash, file_size, file_mtime) del slot, una vez por versión y proceso."""
+    hashes = _hashes.get(version)
+    if hashes is None:
+        with _hashes_lock:
+            hashes = _hashes.get(version)
+            if hashes is None:
+                rows, _ = read_query(
+                    "MATCH (i:Imagen) WHERE i.dataset = $dataset AND i.file_hash IS NOT NULL "
+                    "RETURN i.file_name, i.file_hash, i.file_size, i.file_mtime",
+                    {'dataset': slot},
+                )
+                hashes = {fn: (h, size, mtime) for fn, h, size, mtime in rows}
+                _hashes.clear()
+                _hashes[version] = hashes
+    return hashes
+
+
+def hash_vigente(rel_path, st):
+    """
+    Hash guardado de la imagen `rel_path` si el archivo en disco (`st`) sigue
+    siendo el importado. None si no hay hash o si no se pudo consultar: la
+    imagen se sirve igual, con el ETag débil de tamaño + mtime, y durante
+    DATASET_VERSION_TTL segundos no se vuelve a intentar.
+    """
+    if time.monotonic() < _sin_neo4j_hasta[0]:
+        return None
+    try:
+        estado = current_dataset()
+        hashes = hashes_imagenes(estado.version, estado.slot)
+    except Exception as e:  # Neo4j caído o lento: las imágenes no dependen de él
+        _sin_neo4j_hasta[0] = time.monotonic() + settings.DATASET_VERSION_TTL
+        logger.warning("sin hashes de imágenes (%s); se usa el ETag débil", e)
+        return None
+    file_hash, size, mtime = hashes.get(rel_path, (None, None, None))
+    return file_hash if (size, mtime) == (st.st_size, st.st_mtime) else None
+
+
+def media_path(rel_path):
+    """Ruta absoluta de `rel_path` dentro de MEDIA_ROOT; 404 si sale de ella o no es archivo."""
+    try:
+        path = safe_join(settings.MEDIA_ROOT, rel_path)
+    except SuspiciousFileOperation:
+        raise Http404()
+    if not os.path.isfile(path):
+        raise Http404()
+    return path
+
+
+def serve_file(request, path, content_type=None, etag=None, inmutable=False):
+    """
+    Responde el archivo `path` con GET condicional, cabeceras de caché y
+    (en modo 'django') soporte de Range. Sin `etag` se usa uno débil de
+    tamaño + mtime.
+    """
+    st = os.stat(path)
+    content_type = content_type or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    etag = etag or f'W/"{int(st.st_mtime):x}-{st.st_size:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(st.st_mtime),
+        'Cache-Control': CACHE_INMUTABLE if inmutable else CACHE_REVALIDAR,
+    }
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if response is None:
+        response = _file_response(request, path, st.st_size, etag, content_type)
+    for k, v in headers.items():
+        response[k] = v
+    return response
+
+
+def _file_response(request, path, size, etag, content_type):
+    modo = settings.MEDIA_SERVE_MODE
+    if modo == 'x-accel':
+        rel = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(rel)
+        return response
+    if modo == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+
+    rango = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    # If-Range exige comparación fuerte: con ETag débil se responde completo
+    if rango and (not if_range or (if_range == etag and not etag.startswith('W/'))):
+        try:
+            tramo = _parse_range(rango, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if tramo:
+            start, end = tramo
+            f = open(path, 'rb')
+            f.seek(start)
+            response = FileResponse(_Tramo(f, end - start + 1), status=206, content_type=content_type)
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+    response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return response
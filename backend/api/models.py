@@ -5,21 +5,30 @@ from neomodel import (
 )
 
 class Pais(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     nombre = StringProperty(index=True)
+    nombre_norm = StringProperty(index=True)  # toLower(trim(nombre)), para filtros
 
 class Localidad(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     nombre = StringProperty(index=True)
+    nombre_norm = StringProperty(index=True)  # toLower(trim(nombre)), para filtros
     # relación Localidad -> Pais (para mirrors)
     pais = RelationshipTo(Pais, 'PERTENECE_A')
 
 class Cultura(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     nombre = StringProperty(index=True)
 
 class Coleccion(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     nombre = StringProperty(index=True)
+    nombre_norm = StringProperty(index=True)  # toLower(trim(nombre)), para filtros
 
 class Autor(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     nombre = StringProperty(index=True)
+    nombre_norm = StringProperty(index=True)  # toLower(trim(nombre)), para filtros
 
 class Exposicion(StructuredNode):
     titulo = StringProperty(index=True)
@@ -27,19 +36,29 @@ class Exposicion(StructuredNode):
     fecha_fin = StringProperty()
 
 class Material(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     nombre = StringProperty(index=True)
 
 class Tecnica(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     nombre = StringProperty(index=True)
 
 class Imagen(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
+    uid = StringProperty(index=True)   # id en la API, estable: media.imagen_uid(file_name)
     file_name  = StringProperty()      # p. ej. "00027a.jpg"
+    file_name_key = StringProperty(index=True)  # file_name.casefold(), para ordenar en Neo4j
     descripcion = StringProperty()     # opcional
+    file_hash  = StringProperty()      # hash del contenido (import incremental)
+    file_size  = IntegerProperty()     # bytes, para no re-hashear archivos sin cambios
+    file_mtime = FloatProperty()
 
 class Componente(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     uid = UniqueIdProperty()
     # vínculo “lógico” con la pieza por su número
     pieza_numero_inventario = StringProperty(index=True)  # "27"
+    pieza_numero_inventario_int = IntegerProperty()       # 27, para ordenar por índice
     letra = StringProperty(index=True)
     nombre_comun = StringProperty()
     nombre_atribuido = StringProperty()
@@ -56,6 +75,7 @@ class Componente(StructuredNode):
     espesor_mm = FloatProperty()
 
     estado_conservacion = StringProperty()
+    row_hash = StringProperty()  # hash de la fila del Excel (import incremental)
 
     # relaciones
     materiales = RelationshipTo(Material, 'USO_MATERIAL')
@@ -63,6 +83,7 @@ class Componente(StructuredNode):
     imagenes   = RelationshipTo(Imagen,   'TIENE_IMAGEN')
 
 class Pieza(StructuredNode):
+    dataset = StringProperty(index=True)  # slot blue/green (api/dataset.py)
     uid = UniqueIdProperty()
 
     # Clave pública que usaremos como “id” para el API (entero)
@@ -78,6 +99,7 @@ class Pieza(StructuredNode):
     estante = StringProperty()
     caja_actual = StringProperty()
     tipologia = StringProperty()
+    tipologia_norm = StringProperty(index=True)  # toLower(trim(tipologia)), para filtros
     clasificacion = StringProperty()
     conjunto = StringProperty()
     nombre_comun = StringProperty()
@@ -100,6 +122,7 @@ class Pieza(StructuredNode):
     comentarios_conservacion = StringProperty()
     responsable_coleccion = StringProperty()
     fecha_ultima_modificacion = StringProperty()
+    row_hash = StringProperty()  # hash de la fila del Excel (import incremental)
 
     # relaciones
     pais       = RelationshipTo(Pais, 'PROCEDENTE_DE')
@@ -0,0 +1,134 @@
+# api/neo.py
+"""
+Driver de Neo4j del proceso y acceso directo a él para lo que
+`db.cypher_query` no cubre.
+
+neomodel guarda la conexión por thread (`db` es un threading.local) y, si
+sólo tiene DATABASE_URL, cada thread del servidor arma su propio driver con su
+propio pool. Por eso el driver se crea aquí, uno por proceso, con el pool
+configurado en settings (NEO4J_MAX_POOL_SIZE, ...), y se le entrega a
+neomodel vía `config.DRIVER`: todos los threads comparten ese pool.
+
+Los sockets no se pueden compartir entre procesos: después de un fork
+(workers de gunicorn con --preload, por ejemplo) el hijo descarta el driver
+heredado y crea uno nuevo. Crear el driver no abre conexiones; se abren al
+primer uso.
+
+`db.cypher_query` materializa todas las filas antes de devolverlas; para
+respuestas grandes (exportación) usamos una sesión propia y consumimos el
+resultado en lotes de `fetch_size` registros.
+
+Las consultas de sólo lectura de la API van por `read_query` o con sesiones
+en modo READ: con un clúster (NEO4J_URI `neo4j://...`) el driver las rutea a
+los seguidores / réplicas de lectura y deja el líder para las escrituras.
+"""
+import os
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from neo4j import READ_ACCESS, GraphDatabase, basic_auth
+from neomodel import config, db
+
+_fork_hook = False
+
+
+def _crear_driver():
+    url = urlparse(settings.NEO4J_BOLT_URL)
+    auth = None
+    if url.username:
+        auth = basic_auth(unquote(url.username), unquote(url.password or ''))
+    # La URL tal cual menos las credenciales: conserva los corchetes de una IPv6
+    # y la query (contexto de ruteo de neo4j://, p. ej. ?policy=). La ruta es el
+    # nombre de la base (configurar_driver), como en la DATABASE_URL de neomodel.
+    uri = f"{url.scheme}://{url.netloc.rpartition('@')[2]}"
+    if url.query:
+        uri += f"?{url.query}"
+    return GraphDatabase.driver(
+        uri,
+        auth=auth,
+        max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+        max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        connection_acquisition_timeout=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT,
+        liveness_check_timeout=settings.NEO4J_LIVENESS_CHECK_TIMEOUT,
+        fetch_size=settings.NEO4J_FETCH_SIZE,
+        user_agent=config.USER_AGENT,
+    )
+
+
+def _despues_de_fork():
+    # No cerrar el heredado: sus sockets siguen siendo del proceso padre
+    config.DRIVER = _crear_driver()
+    db.driver = None
+
+
+def configurar_driver():
+    """Crea el driver del proceso y se lo entrega a neomodel (ApiConfig.ready)."""
+    global _fork_hook
+    config.DATABASE_URL = None
+    base = urlparse(settings.NEO4J_BOLT_URL).path.strip('/')
+    if base:
+        config.DATABASE_NAME = base
+    config.DRIVER = _crear_driver()
+    db.driver = None
+    if not _fork_hook and hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_despues_de_fork)
+        _fork_hook = True
+
+
+def get_driver():
+    if not db.driver:
+        db.set_connection(driver=config.DRIVER)
+    return db.driver
+
+
+def pool_stats():
+    """
+    Conexiones del pool de este proceso por servidor (total, en uso, libres).
+
+    El driver no tiene API pública para esto: se leen sus atributos internos
+    (probado con la versión de neo4j fijada en requirements.txt). Si en otra
+    versión no están o cambian de forma, `servidores` es None en vez de fallar.
+    """
+    servidores = None
+    pool = getattr(config.DRIVER, '_pool', None)
+    lock = getattr(pool, 'lock', None)
+    conexiones = getattr(pool, 'connections', None)
+    if lock is not None and hasattr(conexiones, 'items'):
+        try:
+            with lock:
+                por_servidor = {str(a): list(cs) for a, cs in conexiones.items()}
+            servidores = {}
+            for address, cs in por_servidor.items():
+                en_uso = sum(1 for c in cs if getattr(c, 'in_use', False))
+                servidores[address] = {'total': len(cs), 'en_uso': en_uso, 'libres': len(cs) - en_uso}
+        except (AttributeError, TypeError):
+            servidores = None
+    return {
+        'pid': os.getpid(),
+        'max_pool_size': settings.NEO4J_MAX_POOL_SIZE,
+        'servidores': servidores,
+    }
+
+
+def read_query(query, params=None):
+    """`db.cypher_query` dentro de una transacción de lectura (ruteable a réplicas)."""
+    if db._active_transaction:
+        # Ya hay una transacción abierta (p. ej. de escritura): leer dentro de ella
+        return db.cypher_query(query, params)
+    with db.read_transaction:
+        return db.cypher_query(query, params)
+
+
+def stream_query(query, params=None, fetch_size=None):
+    """
+    Itera las filas (dict columna -> valor) de una consulta a medida que llegan.
+
+    La sesión queda abierta mientras se consume el generador y se cierra al
+    agotarlo o al cerrarlo (p. ej. cuando el cliente corta una descarga).
+    """
+    driver = get_driver()
+    with driver.session(database=db._database_name, default_access_mode=READ_ACCESS,
+                        fetch_size=fetch_size or settings.NEO4J_FETCH_SIZE) as session:
+        result = session.run(query, params or {})
+        for record in result:
+            yield dict(record.items())
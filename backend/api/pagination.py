@@ -0,0 +1,144 @@
+# api/pagination.py
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+from .neo import read_query
+
+
+class CypherResultSet:
+    """
+    Secuencia perezosa sobre una consulta Cypher, pensada para entregarse a
+    PageNumberPagination (o a KeysetPagination, vía `seek`) en vez de una
+    lista ya materializada.
+
+    El paginador de Django sólo necesita `count()` y slicing: el total sale de
+    un `RETURN count(...)` y cada página se pide al servidor con SKIP/LIMIT,
+    así que el costo de una página no depende del tamaño del catálogo.
+
+    `match` es la parte MATCH/WHERE de la consulta y debe dejar ligada la
+    variable `var`; `returns` es la proyección de cada fila y `to_python`
+    convierte la fila (lista de valores) al objeto que recibe el serializer.
+    `keep` son otras variables de `match` que el orden necesita (p. ej. `score`).
+    """
+
+    def __init__(self, match, params=None, var='p', order_by='p.numero_inventario_int',
+                 returns=None, to_python=None, keep=()):
+        self.match = match
+        self.params = dict(params or {})
+        self.var = var
+        self.keep = tuple(keep)
+        self.order_by = order_by
+        self.returns = returns or var
+        self.to_python = to_python or (lambda row: row[0])
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            rows, _ = read_query(f"{self.match}\nRETURN count({self.var})", self.params)
+            self._count = rows[0][0] if rows else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            rows = self[key:key + 1]
+            if not rows:
+                raise IndexError(key)
+            return rows[0]
+
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        if stop <= start:
+            return []
+
+        q = f"""
+        {self.match}
+        WITH {', '.join((self.var,) + self.keep)}
+        ORDER BY {self.order_by}
+        SKIP $_skip LIMIT $_limit
+        RETURN {self.returns}
+        """
+        params = dict(self.params, _skip=start, _limit=stop - start)
+        rows, _ = read_query(q, params)
+        return [self.to_python(r) for r in rows]
+
+    def seek(self, key, after=None, limit=10, reverse=False):
+        """
+        Filas siguientes a `after` según `key` (o anteriores, con `reverse`),
+        sin SKIP: el WHERE sobre la clave deja que Neo4j entre por su índice y
+        corte en LIMIT, así que una página profunda cuesta lo mismo que la
+        primera. Devuelve [(valor de key, objeto)] en orden ascendente.
+        """
+        cond = ""
+        if after is not None:
+            cond = f"WHERE {key} {'<' if reverse else '>'} $_after"
+        q = f"""
+        {self.match}
+        WITH {', '.join((self.var,) + self.keep)}
+        {cond}
+        ORDER BY {key}{' DESC' if reverse else ''}
+        LIMIT $_limit
+        RETURN {self.returns}, {key}
+        """
+        params = dict(self.params, _after=after, _limit=limit)
+        rows, _ = read_query(q, params)
+        if reverse:
+            rows.reverse()
+        return [(r[-1], self.to_python(r[:-1])) for r in rows]
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor sobre un CypherResultSet (`?cursor=`), para scroll
+    infinito y páginas profundas.
+
+    El cursor opaco de DRF guarda el último (o primer) valor de `key` de la
+    página y la siguiente se pide con `key > valor` (ver CypherResultSet.seek).
+    La clave tiene que ser única y no nula, como numero_inventario_int dentro
+    de un dataset. No entrega el total: para eso está PageNumberPagination.
+    """
+    key = 'p.numero_inventario_int'
+
+    def paginate_queryset(self, resultset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+
+        reverse, after = False, None
+        if self.cursor is not None:
+            reverse = self.cursor.reverse
+            if self.cursor.position is not None:
+                try:
+                    after = int(self.cursor.position)
+                except ValueError:
+                    raise NotFound(self.invalid_cursor_message)
+
+        rows = resultset.seek(self.key, after, self.page_size + 1, reverse)
+        mas = len(rows) > self.page_size
+        if reverse:
+            rows = rows[-self.page_size:] if mas else rows
+            self.has_previous, self.has_next = mas, after is not None
+        else:
+            rows = rows[:self.page_size]
+            self.has_previous, self.has_next = after is not None, mas
+
+        self.first_key = rows[0][0] if rows else after
+        self.last_key = rows[-1][0] if rows else after
+        if not rows and reverse:
+            # Antes del primer elemento: la siguiente página es el inicio
+            self.has_next, self.last_key = True, None
+        return [obj for _, obj in rows]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        posicion = None if self.last_key is None else str(self.last_key)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=posicion))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first_key is None:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=str(self.first_key)))
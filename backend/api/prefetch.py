@@ -0,0 +1,81 @@
+# api/prefetch.py
+"""
+Precarga de relaciones de Pieza (y de Componente) en una sola consulta.
+
+En vez de que cada serializer haga `.all()` por relación (y por componente),
+la proyección PIEZA_PREFETCH trae en la misma fila la pieza, los nombres de
+sus dominios, sus componentes (con materiales/técnicas/imágenes) y sus
+imágenes, usando pattern comprehensions. `inflate_pieza` deja esos datos en
+`_prefetched`, que es lo que leen los serializers cuando está presente.
+"""
+from .models import Pieza, Componente
+
+# Mapa de un componente `c` con sus relaciones (lo que lee inflate_componente)
+_COMPONENTE_MAP = """{
+    nodo: c,
+    materiales: [(c)-[:USO_MATERIAL]->(x:Material) | x.nombre],
+    tecnica: [(c)-[:USO_TECNICA]->(x:Tecnica) | x.nombre],
+    imagenes: [(c)-[:TIENE_IMAGEN]->(i:Imagen) | i {.uid, .file_name, .descripcion, .file_hash}]
+}"""
+
+# Proyección para una variable `c` ya ligada a un (:Componente)
+COMPONENTE_PREFETCH = _COMPONENTE_MAP
+
+# Proyección para una variable `p` ya ligada a una (:Pieza)
+PIEZA_PREFETCH = """
+p,
+[(p)-[:PERTENECE_A]->(x:Coleccion) | x.nombre] AS coleccion,
+[(p)-[:CREADO_POR]->(x:Autor) | x.nombre] AS autor,
+[(p)-[:FILIACION]->(x:Cultura) | x.nombre] AS filiacion_cultural,
+[(p)-[:PROCEDENTE_DE]->(x:Pais) | x.nombre] AS pais,
+[(p)-[:LOCALIZADO_EN]->(x:Localidad) | x.nombre] AS localidad,
+[(p)-[:HECHO_CON]->(x:Tecnica) | x.nombre] AS tecnica,
+[(p)-[:HECHO_DE]->(x:Material) | x.nombre] AS materiales,
+[(p)-[:TIENE_COMPONENTE]->(c:Componente) | """ + _COMPONENTE_MAP + """] AS componentes,
+[(p)-[:TIENE_IMAGEN]->(i:Imagen) | i {.uid, .file_name, .descripcion, .file_hash}] AS imagenes
+"""
+
+_PIEZA_RELS = (
+    'coleccion', 'autor', 'filiacion_cultural', 'pais', 'localidad',
+    'tecnica', 'materiales', 'componentes', 'imagenes',
+)
+
+
+def inflate_componente(d):
+    c = Componente.inflate(d['nodo'])
+    c._prefetched = {
+        'materiales': d['materiales'],
+        'tecnica': d['tecnica'],
+        'imagenes': d['imagenes'],
+    }
+    return c
+
+
+def inflate_pieza(row):
+    """Fila de PIEZA_PREFETCH -> Pieza con `_prefetched` listo para PiezaOutSerializer."""
+    p = Pieza.inflate(row[0])
+    pre = dict(zip(_PIEZA_RELS, row[1:]))
+    pre['componentes'] = [inflate_componente(d) for d in pre['componentes']]
+    p._prefetched = pre
+    return p
+
+
+# Fila plana para exportación: nombres de dominio ya resueltos (el primero no
+# vacío, como `_first_name`) y la lista de materiales.
+PIEZA_EXPORT = """
+p.numero_inventario AS numero_inventario,
+p.nombre_especifico AS nombre_especifico,
+head([(p)-[:CREADO_POR]->(x:Autor) WHERE x.nombre <> '' | x.nombre]) AS autor,
+head([(p)-[:PERTENECE_A]->(x:Coleccion) WHERE x.nombre <> '' | x.nombre]) AS coleccion,
+head([(p)-[:PROCEDENTE_DE]->(x:Pais) WHERE x.nombre <> '' | x.nombre]) AS pais,
+head([(p)-[:LOCALIZADO_EN]->(x:Localidad) WHERE x.nombre <> '' | x.nombre]) AS localidad,
+p.fecha_creacion AS fecha_creacion,
+[(p)-[:HECHO_DE]->(x:Material) | x.nombre] AS materiales,
+p.estado_conservacion AS estado_conservacion,
+p.descripcion AS descripcion,
+p.numero_registro_anterior AS numero_registro_anterior,
+p.codigo_surdoc AS codigo_surdoc,
+p.ubicacion AS ubicacion,
+p.deposito AS deposito,
+p.estante AS estante
+"""
@@ -0,0 +1,146 @@
+# api/profiler.py
+"""
+Perfil de las consultas Cypher de cada request.
+
+`instalar()` (ApiConfig.ready) envuelve `Database.cypher_query`, por donde
+pasan neomodel, `read_query` y las consultas directas de la API. Mientras
+corre un request, CypherProfilerMiddleware deja un `Perfil` en un ContextVar
+y cada consulta anota su duración, filas y texto. Al terminar, el middleware
+agrega `Server-Timing` (visible en la pestaña Network del navegador) y
+escribe una línea JSON en el logger `api.cypher`.
+
+Las consultas que superan CYPHER_SLOW_QUERY_MS se registran con su texto y,
+si CYPHER_PROFILE_SLOW está activo (no lo está por omisión) y son de sólo
+lectura, con el plan de `PROFILE`: se ejecutan otra vez, una sola vez por
+proceso para cada texto, dentro del mismo request, que tarda el doble.
+
+Las exportaciones en streaming (`stream_query`) leen después de que el
+middleware ya respondió, así que no quedan en el perfil.
+"""
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from neo4j import READ_ACCESS
+from neomodel import db
+from neomodel.sync_.core import Database
+
+logger = logging.getLogger('api.cypher')
+
+_perfil = ContextVar('perfil_cypher', default=None)
+_ESCRITURA_RE = re.compile(r'\b(CREATE|MERGE|SET|DELETE|REMOVE|DETACH|DROP|LOAD\s+CSV)\b', re.I)
+_perfilados = set()
+_instalado = False
+
+
+class Perfil:
+    def __init__(self):
+        self.consultas = []   # (ms, filas, texto)
+
+    @property
+    def total_ms(self):
+        return sum(c[0] for c in self.consultas)
+
+    def lentas(self, n=3):
+        return sorted(self.consultas, key=lambda c: -c[0])[:n]
+
+
+def _texto(query):
+    return ' '.join(query.split())
+
+
+def _plan(nodo, nivel=0):
+    """Árbol de `summary.profile` -> líneas 'Operador rows=.. dbHits=..' indentadas."""
+    args = nodo.get('args', {})
+    lineas = [
+        f"{'  ' * nivel}{nodo.get('operatorType')} rows={nodo.get('rows')} "
+        f"dbHits={nodo.get('dbHits')} {args.get('Details', '')}".rstrip()
+    ]
+    for hijo in nodo.get('children', []):
+        lineas.extend(_plan(hijo, nivel + 1))
+    return lineas
+
+
+def _profile(query, params):
+    with db.driver.session(database=db._database_name, default_access_mode=READ_ACCESS) as session:
+        summary = session.run('PROFILE ' + query, params or {}).consume()
+    return '\n'.join(_plan(summary.profile)) if summary.profile else ''
+
+
+def _consulta_lenta(query, params, ms, filas):
+    texto = _texto(query)
+    plan = ''
+    if (settings.CYPHER_PROFILE_SLOW and texto not in _perfilados
+            and not _ESCRITURA_RE.search(query)):
+        _perfilados.add(texto)
+        try:
+            plan = _profile(query, params)
+        except Exception as e:  # el perfil es diagnóstico: nunca debe romper el request
+            plan = f"(PROFILE falló: {e})"
+    logger.warning(
+        "consulta lenta %.1f ms, %s filas: %s%s", ms, filas, texto,
+        f"\n{plan}" if plan else '',
+    )
+
+
+def instalar():
+    """Envuelve Database.cypher_query (una vez por proceso)."""
+    global _instalado
+    if _instalado:
+        return
+    original = Database.cypher_query
+
+    def cypher_query(self, query, params=None, *args, **kwargs):
+        perfil = _perfil.get()
+        if perfil is None:
+            return original(self, query, params, *args, **kwargs)
+        t0 = time.perf_counter()
+        rows, meta = original(self, query, params, *args, **kwargs)
+        ms = (time.perf_counter() - t0) * 1000
+        filas = len(rows) if rows else 0
+        perfil.consultas.append((ms, filas, query))
+        if ms >= settings.CYPHER_SLOW_QUERY_MS:
+            _consulta_lenta(query, params, ms, filas)
+        return rows, meta
+
+    Database.cypher_query = cypher_query
+    _instalado = True
+
+
+class CypherProfilerMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        perfil = Perfil()
+        token = _perfil.set(perfil)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _perfil.reset(token)
+        total_ms = (time.perf_counter() - t0) * 1000
+
+        n = len(perfil.consultas)
+        response['Server-Timing'] = ', '.join([
+            f'cypher;desc="{n} consultas";dur={perfil.total_ms:.1f}',
+            f'app;dur={total_ms:.1f}',
+        ])
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'consultas': n,
+                'cypher_ms': round(perfil.total_ms, 1),
+                'total_ms': round(total_ms, 1),
+                'filas': sum(c[1] for c in perfil.consultas),
+                'lentas': [
+                    {'ms': round(ms, 1), 'filas': filas, 'query': _texto(q)[:300]}
+                    for ms, filas, q in perfil.lentas()
+                ],
+            }, ensure_ascii=False))
+        return response
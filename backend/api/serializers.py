@@ -1,19 +1,49 @@
 # api/serializers.py
-from django.conf import settings
 from rest_framework import serializers
-from .models import (
-    Pieza, Componente, Imagen, Autor, Pais, Localidad, Cultura,
-    Coleccion, Material, Tecnica
-)
-
-def _first_name(qs):
-    for n in qs:
-        if hasattr(n, 'nombre') and n.nombre:
-            return n.nombre
-        if hasattr(n, 'titulo') and n.titulo:
-            return n.titulo
+from .derivados import derivado_url
+from .media import media_url
+from .models import Pieza
+
+def _first_name(names):
+    for n in names:
+        if n:
+            return n
     return None
 
+def _rel_names(obj, rel):
+    """Nombres de una relación; si el objeto viene de api/prefetch.py no consulta Neo4j."""
+    pre = getattr(obj, '_prefetched', None)
+    if pre is not None:
+        return pre[rel]
+    return [n.nombre for n in getattr(obj, rel).all()]
+
+def _rel_componentes(p):
+    pre = getattr(p, '_prefetched', None)
+    if pre is not None:
+        return pre['componentes']
+    return p.componentes.all()
+
+def _rel_imagenes(obj):
+    pre = getattr(obj, '_prefetched', None)
+    if pre is not None:
+        return pre['imagenes']
+    return [
+        {'uid': i.uid, 'file_name': i.file_name, 'descripcion': i.descripcion, 'file_hash': i.file_hash}
+        for i in obj.imagenes.all()
+    ]
+
+def _imagenes_json(imgs, request):
+    out = []
+    for i in imgs:
+        out.append({
+            'id': i.get('uid'),
+            'imagen': media_url(i['file_name'], i.get('file_hash'), request),
+            'thumb': derivado_url(i.get('file_hash'), 'thumb', request),
+            'medium': derivado_url(i.get('file_hash'), 'medium', request),
+            'descripcion': i['descripcion'] if (i['descripcion'] or None) else None
+        })
+    return out
+
 def _none_if_zeroish(val):
     if val is None:
         return None
@@ -30,20 +60,30 @@ def _fmt_fecha_con_hora_or_nat(val):
 
 
 # -----------------------------
-#  Imágenes (compat sqlite)
+#  Imágenes (compat sqlite): nodos Imagen del listado, detalle y altas
 # -----------------------------
 class ImagenOutSerializer(serializers.Serializer):
     id = serializers.SerializerMethodField()
     imagen = serializers.SerializerMethodField()
-    descripcion = serializers.CharField(allow_blank=True, allow_null=True, required=False)
+    thumb = serializers.SerializerMethodField()
+    medium = serializers.SerializerMethodField()
+    descripcion = serializers.SerializerMethodField()
 
     def get_id(self, obj):
-        return None
+        return obj.uid
+
+    def get_descripcion(self, obj):
+        # igual que en _imagenes_json: sin descripción -> null
+        return obj.descripcion or None
 
     def get_imagen(self, obj):
-        request = self.context.get('request')
-        rel = f"{settings.MEDIA_URL}{obj.file_name}"
-        return request.build_absolute_uri(rel) if request else rel
+        return media_url(obj.file_name, obj.file_hash, self.context.get('request'))
+
+    def get_thumb(self, obj):
+        return derivado_url(obj.file_hash, 'thumb', self.context.get('request'))
+
+    def get_medium(self, obj):
+        return derivado_url(obj.file_hash, 'medium', self.context.get('request'))
 
 
 # -----------------------------
@@ -58,8 +98,8 @@ class ComponenteOutSerializer(serializers.Serializer):
     descripcion = serializers.CharField(allow_blank=True, required=False)
     funcion = serializers.CharField(allow_blank=True, required=False)
     forma = serializers.CharField(allow_blank=True, required=False)
-    materiales = serializers.ListField(child=serializers.CharField(), read_only=True)
-    tecnica = serializers.ListField(child=serializers.CharField(), read_only=True)
+    materiales = serializers.SerializerMethodField()
+    tecnica = serializers.SerializerMethodField()
     marcas_inscripciones = serializers.CharField(allow_blank=True, required=False)
     peso_kg = serializers.FloatField(required=False)
     alto_cm = serializers.FloatField(required=False)
@@ -68,27 +108,28 @@ class ComponenteOutSerializer(serializers.Serializer):
     diametro_cm = serializers.FloatField(required=False)
     espesor_mm = serializers.FloatField(required=False)
     estado_conservacion = serializers.CharField(allow_blank=True, required=False)
-    imagenes = serializers.ListField(child=serializers.DictField(), read_only=True)
+    imagenes = serializers.SerializerMethodField()
 
     def get_id(self, c):
-        return self.context.get('next_comp_id')()
+        # Dentro de una pieza se usa la numeración histórica (PiezaOutSerializer);
+        # suelto, el id es número + letra ("27a"), que es como lo busca /api/componentes/<id>/
+        next_comp_id = self.context.get('next_comp_id')
+        if next_comp_id:
+            return next_comp_id()
+        return f"{c.pieza_numero_inventario}{c.letra or ''}"
+
+    def get_materiales(self, c):
+        return _rel_names(c, 'materiales')
+
+    def get_tecnica(self, c):
+        return _rel_names(c, 'tecnica')
+
+    def get_imagenes(self, c):
+        return _imagenes_json(_rel_imagenes(c), self.context.get('request'))
 
     def to_representation(self, c):
         base = super().to_representation(c)
         base['pieza'] = int(c.pieza_numero_inventario)
-        base['materiales'] = [m.nombre for m in c.materiales.all()]
-        base['tecnica']    = [t.nombre for t in c.tecnica.all()]
-        request = self.context.get('request')
-        imgs, img_id = [], 0
-        for i in c.imagenes.all():
-            img_id += 1
-            rel = f"{settings.MEDIA_URL}{i.file_name}"
-            imgs.append({
-                'id': img_id,
-                'imagen': request.build_absolute_uri(rel) if request else rel,
-                'descripcion': i.descripcion if (i.descripcion or None) else None
-            })
-        base['imagenes'] = imgs
         return base
 
 
@@ -121,8 +162,8 @@ class PiezaOutSerializer(serializers.Serializer):
     bibliografia = serializers.CharField(allow_blank=True, required=False)
     iconografia = serializers.CharField(allow_blank=True, required=False)
     notas_investigacion = serializers.CharField(allow_blank=True, required=False)
-    tecnica = serializers.ListField(child=serializers.CharField(), read_only=True)
-    materiales = serializers.ListField(child=serializers.CharField(), read_only=True)
+    tecnica = serializers.SerializerMethodField()
+    materiales = serializers.SerializerMethodField()
     estado_conservacion = serializers.CharField(allow_blank=True, required=False)
     descripcion_conservacion = serializers.SerializerMethodField()
     responsable_conservacion = serializers.CharField(allow_blank=True, required=False)
@@ -134,26 +175,26 @@ class PiezaOutSerializer(serializers.Serializer):
     fecha_ingreso = serializers.CharField(allow_blank=True, required=False)
     responsable_coleccion = serializers.CharField(allow_blank=True, required=False)
     fecha_ultima_modificacion = serializers.CharField(allow_blank=True, required=False)
-    componentes = ComponenteOutSerializer(many=True, read_only=True)
-    imagenes = ImagenOutSerializer(many=True, read_only=True)
+    componentes = serializers.SerializerMethodField()
+    imagenes = serializers.SerializerMethodField()
 
     def get_id(self, p: Pieza):
         return int(p.numero_inventario)
 
     def get_coleccion(self, p: Pieza):
-        return _first_name(p.coleccion.all())
+        return _first_name(_rel_names(p, 'coleccion'))
 
     def get_autor(self, p: Pieza):
-        return _first_name(p.autor.all())
+        return _first_name(_rel_names(p, 'autor'))
 
     def get_filiacion_cultural(self, p: Pieza):
-        return _first_name(p.filiacion_cultural.all())
+        return _first_name(_rel_names(p, 'filiacion_cultural'))
 
     def get_pais(self, p: Pieza):
-        return _first_name(p.pais.all())
+        return _first_name(_rel_names(p, 'pais'))
 
     def get_localidad(self, p: Pieza):
-        return _first_name(p.localidad.all())
+        return _first_name(_rel_names(p, 'localidad'))
 
     def get_deposito(self, p: Pieza):
         return _none_if_zeroish(getattr(p, 'deposito', None))
@@ -167,47 +208,40 @@ class PiezaOutSerializer(serializers.Serializer):
     def get_fecha_actualizacion_conservacion(self, p: Pieza):
         return _fmt_fecha_con_hora_or_nat(getattr(p, 'fecha_actualizacion_conservacion', None))
 
-    def to_representation(self, p: Pieza):
-        comp_counter = [0]
+    def get_tecnica(self, p: Pieza):
+        return _rel_names(p, 'tecnica')
+
+    def get_materiales(self, p: Pieza):
+        return _rel_names(p, 'materiales')
+
+    def get_componentes(self, p: Pieza):
+        comps = sorted(_rel_componentes(p), key=lambda c: c.letra or '')
+        # Se conserva la numeración histórica de la API: los ids de componente
+        # de una pieza con n componentes van de n+1 a 2n.
+        comp_counter = [len(comps)]
         def next_comp_id():
             comp_counter[0] += 1
             return comp_counter[0]
-        self.fields['componentes'].context['next_comp_id'] = next_comp_id
-
-        data = super().to_representation(p)
-        data['tecnica'] = [t.nombre for t in p.tecnica.all()]
-        data['materiales'] = [m.nombre for m in p.materiales.all()]
 
         ctx = {'request': self.context.get('request'), 'next_comp_id': next_comp_id}
+        return [ComponenteOutSerializer(c, context=ctx).data for c in comps]
 
-        comps = sorted(p.componentes.all(), key=lambda c: c.letra or '')
-        data['componentes'] = [ComponenteOutSerializer(c, context=ctx).data for c in comps]
-
-        request = self.context.get('request')
-        imgs, img_id = [], 0
-        for i in p.imagenes.all():
-            img_id += 1
-            rel = f"{settings.MEDIA_URL}{i.file_name}"
-            imgs.append({
-                'id': img_id,
-                'imagen': request.build_absolute_uri(rel) if request else rel,
-                'descripcion': i.descripcion if (i.descripcion or None) else None
-            })
-        data['imagenes'] = imgs
-        return data
+    def get_imagenes(self, p: Pieza):
+        return _imagenes_json(_rel_imagenes(p), self.context.get('request'))
 
 
 # -----------------------------
 #  Piezas (serializer minimal para exportación masiva)
 # -----------------------------
 class PiezaExportSerializer(serializers.Serializer):
-    # Sólo los campos necesarios para CSV/Excel en el front
+    # Sólo los campos necesarios para CSV/Excel en el front.
+    # Recibe filas planas (dict) de api/prefetch.PIEZA_EXPORT, no nodos.
     numero_inventario = serializers.CharField()
     nombre_especifico = serializers.CharField(allow_blank=True, required=False)
-    autor = serializers.SerializerMethodField()
-    coleccion = serializers.SerializerMethodField()
-    pais = serializers.SerializerMethodField()
-    localidad = serializers.SerializerMethodField()
+    autor = serializers.CharField(allow_null=True, required=False)
+    coleccion = serializers.CharField(allow_null=True, required=False)
+    pais = serializers.CharField(allow_null=True, required=False)
+    localidad = serializers.CharField(allow_null=True, required=False)
     fecha_creacion = serializers.CharField(allow_blank=True, required=False)
     materiales = serializers.ListField(child=serializers.CharField(), read_only=True)
     estado_conservacion = serializers.CharField(allow_blank=True, required=False)
@@ -217,35 +251,3 @@ class PiezaExportSerializer(serializers.Serializer):
     ubicacion = serializers.CharField(allow_blank=True, required=False)
     deposito = serializers.CharField(allow_blank=True, required=False)
     estante = serializers.CharField(allow_blank=True, required=False)
-
-    def get_autor(self, p: Pieza):
-        return _first_name(p.autor.all())
-
-    def get_coleccion(self, p: Pieza):
-        return _first_name(p.coleccion.all())
-
-    def get_pais(self, p: Pieza):
-        return _first_name(p.pais.all())
-
-    def get_localidad(self, p: Pieza):
-        return _first_name(p.localidad.all())
-
-    def to_representation(self, p: Pieza):
-        data = super().to_representation(p)
-        data['materiales'] = [m.nombre for m in p.materiales.all()]
-        return data
-
-class ImagenListSerializer(serializers.Serializer):
-    id = serializers.SerializerMethodField()
-    imagen = serializers.SerializerMethodField()
-    descripcion = serializers.CharField(allow_blank=True, allow_null=True, required=False)
-
-    def get_id(self, obj):
-        # Si tienes un contador en el contexto, úsalo
-        next_img_id = self.context.get('next_img_id')
-        return next_img_id() if next_img_id else None
-
-    def get_imagen(self, obj):
-        request = self.context.get('request')
-        rel = f"{settings.MEDIA_URL}{obj.file_name}"
-        return request.build_absolute_uri(rel) if request else rel
\ No newline at end of file
@@ -0,0 +1,105 @@
+# api/suggest.py
+"""
+Autocompletado de valores de filtro (/api/suggest/).
+
+Por campo se arma en memoria un trie sobre los nombres plegados (sin tildes,
+minúsculas), con cada nombre colgado desde el inicio de cada una de sus
+palabras ("Pérez, Juan" aparece con "per" y con "juan"). Los nombres se
+insertan de mayor a menor número de piezas, así que cada nodo guarda
+directamente sus primeros TOP_K: responder un prefijo es bajar por el trie y
+cortar la lista, sin ordenar nada en el request.
+
+Los índices se construyen la primera vez que se piden y se descartan cuando
+cambia la versión del dataset (api/dataset.py).
+"""
+import re
+import threading
+
+from .busqueda import fold
+from .neo import read_query
+
+TOP_K = 20
+
+# campo -> consulta (sobre el slot $dataset) que devuelve (nombre, piezas)
+CAMPOS = {
+    'autor': "MATCH (n:Autor {dataset: $dataset}) RETURN n.nombre, COUNT { (:Pieza)-[:CREADO_POR]->(n) }",
+    'coleccion': "MATCH (n:Coleccion {dataset: $dataset}) RETURN n.nombre, COUNT { (:Pieza)-[:PERTENECE_A]->(n) }",
+    'pais': "MATCH (n:Pais {dataset: $dataset}) RETURN n.nombre, COUNT { (:Pieza)-[:PROCEDENTE_DE]->(n) }",
+    'localidad': "MATCH (n:Localidad {dataset: $dataset}) RETURN n.nombre, COUNT { (:Pieza)-[:LOCALIZADO_EN]->(n) }",
+    'tipologia': """
+    MATCH (p:Pieza {dataset: $dataset})
+    WITH trim(coalesce(p.tipologia,'')) AS nombre
+    WHERE nombre <> ''
+    RETURN nombre, count(*)
+    """,
+}
+
+
+class _Nodo:
+    __slots__ = ('hijos', 'top')
+
+    def __init__(self):
+        self.hijos = {}
+        self.top = []
+
+
+class SuggestIndex:
+    """Trie de prefijos con los TOP_K nombres (por piezas) precalculados en cada nodo."""
+
+    def __init__(self, entradas, k=TOP_K):
+        # Igual que _catalog_json: nombres sin espacios extremos, sin vacíos ni repetidos
+        piezas = {}
+        for nombre, n in entradas:
+            nombre = (nombre or '').strip()
+            if nombre:
+                piezas[nombre] = piezas.get(nombre, 0) + (n or 0)
+
+        self.k = k
+        self.raiz = _Nodo()
+        for nombre, n in sorted(piezas.items(), key=lambda kv: (-kv[1], kv[0].casefold())):
+            self._insertar({'nombre': nombre, 'count': n})
+
+    def _insertar(self, item):
+        plegado = fold(item['nombre'])
+        vistos = set()
+        inicios = {0} | {m.start() for m in re.finditer(r'(?<=\W)\w', plegado)}
+        for i in sorted(inicios):
+            nodo = self.raiz
+            self._anotar(nodo, item, vistos)
+            for ch in plegado[i:]:
+                nodo = nodo.hijos.setdefault(ch, _Nodo())
+                self._anotar(nodo, item, vistos)
+
+    def _anotar(self, nodo, item, vistos):
+        # Un nombre puede pasar dos veces por el mismo nodo ("Ana Ana"): se cuenta una
+        if len(nodo.top) < self.k and id(nodo) not in vistos:
+            nodo.top.append(item)
+        vistos.add(id(nodo))
+
+    def buscar(self, prefijo, limit):
+        nodo = self.raiz
+        for ch in fold(prefijo.strip()):
+            nodo = nodo.hijos.get(ch)
+            if nodo is None:
+                return []
+        return nodo.top[:limit]
+
+
+_indices = {}
+_lock = threading.Lock()
+
+
+def suggest_index(campo, version, slot):
+    """Índice de `campo` para la versión dada del dataset (se construye una vez por proceso)."""
+    key = (campo, version)
+    index = _indices.get(key)
+    if index is None:
+        with _lock:
+            index = _indices.get(key)
+            if index is None:
+                rows, _ = read_query(CAMPOS[campo], {'dataset': slot})
+                index = SuggestIndex(rows)
+                for old in [k for k in _indices if k[0] == campo]:
+                    del _indices[old]
+                _indices[key] = index
+    return index
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from api import views
+
+EXISTENTES = {'2', '5', '7', '30'}
+
+
+def fake_read_query(q, params):
+    # Una fila por número encontrado (como el UNWIND, sin orden garantizado): [pieza, num]
+    return [[n, n] for n in sorted(params['nums']) if n in EXISTENTES], None
+
+
+class FakeSerializer:
+    def __init__(self, piezas, many=False, context=None):
+        self.data = [{'numero_inventario': p} for p in piezas]
+
+
+class BulkTests(SimpleTestCase):
+    def setUp(self):
+        for target, value in (
+            ('current_slot', mock.Mock(return_value='blue')),
+            ('read_query', mock.Mock(side_effect=fake_read_query)),
+            ('inflate_pieza', lambda row: row[0]),
+            ('PiezaOutSerializer', FakeSerializer),
+        ):
+            patcher = mock.patch.object(views, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _nums(self, resp):
+        self.assertEqual(resp.status_code, 200, resp.content)
+        data = resp.json()
+        return [p['numero_inventario'] for p in data['results']], data['missing']
+
+    def test_get_ids(self):
+        resp = self.client.get('/api/piezas/bulk/', {'ids': '30,2,99, 2,7'})
+        # En el orden pedido, sin repetidos, y los que faltan en `missing` (también en orden)
+        self.assertEqual(self._nums(resp), (['30', '2', '7'], ['99']))
+
+    def test_get_ids_repetido_y_ceros(self):
+        resp = self.client.get('/api/piezas/bulk/?ids=005&ids=88,30&ids=77')
+        self.assertEqual(self._nums(resp), (['5', '30'], ['88', '77']))
+
+    def test_post_dict(self):
+        resp = self.client.post('/api/piezas/bulk/', {'ids': [5, '30', 99]}, content_type='application/json')
+        self.assertEqual(self._nums(resp), (['5', '30'], ['99']))
+
+    def test_post_lista(self):
+        resp = self.client.post('/api/piezas/bulk/', [7, 5], content_type='application/json')
+        self.assertEqual(self._nums(resp), (['7', '5'], []))
+
+    def test_post_cuerpo_invalido(self):
+        for body in ('"12,5"', '12', '{"ids": "12,5"}'):
+            resp = self.client.post('/api/piezas/bulk/', body, content_type='application/json')
+            self.assertEqual(resp.status_code, 400, body)
+            self.assertIn('ids', resp.json())
+        views.read_query.assert_not_called()
+
+    def test_ids_no_numericos(self):
+        resp = self.client.get('/api/piezas/bulk/', {'ids': '12,abc'})
+        self.assertEqual(resp.status_code, 400)
+        resp = self.client.post('/api/piezas/bulk/', {'ids': [1, 'x']}, content_type='application/json')
+        self.assertEqual(resp.status_code, 400)
+        views.read_query.assert_not_called()
+
+    @override_settings(PIEZAS_BULK_MAX=3)
+    def test_maximo(self):
+        self.assertEqual(self.client.get('/api/piezas/bulk/', {'ids': '1,2,3'}).status_code, 200)
+        # Los repetidos no cuentan para el máximo
+        self.assertEqual(self.client.get('/api/piezas/bulk/', {'ids': '1,2,3,3'}).status_code, 200)
+        resp = self.client.get('/api/piezas/bulk/', {'ids': '1,2,3,4'})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('Máximo 3', str(resp.json()['ids']))
+
+    def test_vacio(self):
+        self.assertEqual(self._nums(self.client.get('/api/piezas/bulk/')), ([], []))
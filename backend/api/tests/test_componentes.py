@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from api import pagination, views
+from api.management.commands.import_mapa import COMPONENTE_PROPS, _componente_rows
+from api.serializers import ComponenteOutSerializer, PiezaOutSerializer
+
+
+class ComponenteRowsTests(SimpleTestCase):
+    def test_numero_entero_para_ordenar(self):
+        df = pd.DataFrame([{k: '' for k in COMPONENTE_PROPS} | {
+            'pieza_numero_inventario': '27', 'pieza_numero_inventario_int': 27, 'letra': 'a',
+            'peso_kg': 0.5, 'materialidad': 'madera; metal', 'tecnica': '',
+        }])
+        (row,) = _componente_rows(df)
+        self.assertEqual(row['props']['pieza_numero_inventario'], '27')
+        self.assertEqual(row['props']['pieza_numero_inventario_int'], 27)
+        self.assertEqual(row['props']['peso_kg'], 0.5)
+        self.assertEqual(row['materiales'], ['madera', 'metal'])
+
+
+class ComponenteListTests(SimpleTestCase):
+    def test_orden_por_entero_indexado(self):
+        consultas = []
+
+        def fake(q, params):
+            consultas.append(q)
+            return ([[1]] if 'RETURN count(c)' in q else []), None
+
+        with mock.patch.object(views, 'current_slot', return_value='blue'), \
+                mock.patch.object(pagination, 'read_query', side_effect=fake):
+            resp = self.client.get('/api/componentes/', {'pieza_numero_inventario': '027'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['count'], 1)
+        pagina = [q for q in consultas if 'ORDER BY' in q]
+        self.assertTrue(pagina)
+        self.assertIn('ORDER BY c.pieza_numero_inventario_int, c.letra', pagina[0])
+        self.assertNotIn('toInteger', pagina[0])
+
+
+def _componente(letra):
+    return SimpleNamespace(
+        pieza_numero_inventario='27', pieza_numero_inventario_int=27, letra=letra,
+        _prefetched={'materiales': [], 'tecnica': [], 'imagenes': []},
+    )
+
+
+class ComponenteIdTests(SimpleTestCase):
+    def test_suelto_es_numero_mas_letra(self):
+        self.assertEqual(ComponenteOutSerializer(_componente('a')).data['id'], '27a')
+
+    def test_dentro_de_la_pieza_numeracion_historica(self):
+        comps = [_componente('b'), _componente('a')]
+        with mock.patch('api.serializers._rel_componentes', return_value=comps):
+            data = PiezaOutSerializer().get_componentes(SimpleNamespace())
+        self.assertEqual([(c['id'], c['letra']) for c in data], [(3, 'a'), (4, 'b')])
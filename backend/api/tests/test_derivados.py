@@ -0,0 +1,48 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from api import views
+from api.derivados import RENDICIONES, derivado_path, generar
+
+FILE_HASH = '0123456789abcdef0123456789abcdef'
+
+
+class DerivadosTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.media = tmp.name
+        self.src = os.path.join(self.media, '00027.jpg')
+        Image.new('RGB', (3000, 2000), (120, 80, 40)).save(self.src, 'JPEG')
+        settings = override_settings(
+            MEDIA_ROOT=self.media, DERIVADOS_ROOT=os.path.join(self.media, '_derivados'),
+            DERIVADOS_FORMATO='webp',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _en_disco(self):
+        return {r for r in RENDICIONES if os.path.exists(derivado_path(FILE_HASH, r))}
+
+    def test_generar_todas(self):
+        self.assertEqual(generar(self.src, FILE_HASH), len(RENDICIONES))
+        self.assertEqual(self._en_disco(), set(RENDICIONES))
+        self.assertEqual(generar(self.src, FILE_HASH), 0)
+
+    def test_generar_solo_la_pedida(self):
+        self.assertEqual(generar(self.src, FILE_HASH, rendiciones=('thumb',)), 1)
+        self.assertEqual(self._en_disco(), {'thumb'})
+        with Image.open(derivado_path(FILE_HASH, 'thumb')) as im:
+            self.assertEqual(max(im.size), RENDICIONES['thumb'])
+
+    def test_vista_genera_solo_la_rendicion_pedida(self):
+        with mock.patch.object(views, 'current_slot', return_value='blue'), \
+                mock.patch.object(views, 'read_query', return_value=([['00027.jpg']], None)):
+            resp = self.client.get(f'/api/derivados/thumb/{FILE_HASH}/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'image/webp')
+        self.assertEqual(self._en_disco(), {'thumb'})
@@ -0,0 +1,79 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from pandas.testing import assert_frame_equal
+
+from api.management.commands import _excel
+from api.management.commands._excel import clave_cache, leer_inventario
+from api.management.commands._sintetico import escribir_excel, inventario
+
+
+class LeerInventarioTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.excel = os.path.join(tmp.name, 'inventario.xlsx')
+        escribir_excel(self.excel, inventario(20))
+        self.cache_dir = os.path.join(tmp.name, 'cache')
+        settings = override_settings(IMPORT_CACHE_DIR=self.cache_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_cache_igual_a_lectura_fresca(self):
+        fresco, origen = leer_inventario(self.excel)
+        self.assertEqual(origen, _excel.motor())
+        self.assertEqual(
+            [os.path.splitext(f)[1] for f in os.listdir(self.cache_dir)], [f'.{_excel.CACHE_EXT}']
+        )
+        cacheado, origen = leer_inventario(self.excel)
+        self.assertEqual(origen, 'caché')
+        assert_frame_equal(cacheado, fresco)
+        sin_cache, _ = leer_inventario(self.excel, cache=False)
+        assert_frame_equal(cacheado, sin_cache)
+
+    def test_cache_en_pickle_sin_pyarrow(self):
+        with mock.patch.object(_excel, 'CACHE_EXT', 'pkl'):
+            fresco, _ = leer_inventario(self.excel)
+            cacheado, origen = leer_inventario(self.excel)
+        self.assertEqual(origen, 'caché')
+        assert_frame_equal(cacheado, fresco)
+        self.assertTrue(all(f.endswith('.pkl') for f in os.listdir(self.cache_dir)))
+
+    def test_sin_cache_no_lee_ni_escribe(self):
+        with mock.patch.object(_excel, 'clave_cache') as clave:
+            leer_inventario(self.excel, cache=False)
+        clave.assert_not_called()   # no hashea el Excel
+        self.assertFalse(os.path.exists(self.cache_dir))
+        leer_inventario(self.excel)
+        with mock.patch.object(_excel, '_leer', wraps=_excel._leer) as leer:
+            _, origen = leer_inventario(self.excel, cache=False)
+        self.assertEqual(origen, _excel.motor())
+        leer.assert_called_once()
+
+    def test_clave_incluye_pandas_y_columnas(self):
+        clave = clave_cache(self.excel)
+        self.assertEqual(clave_cache(self.excel), clave)
+        with mock.patch.object(_excel.pd, '__version__', '0.0.0'):
+            self.assertNotEqual(clave_cache(self.excel), clave)
+        with mock.patch.object(_excel, 'COLUMNAS_NUM', _excel.COLUMNAS_NUM[:-1]):
+            self.assertNotEqual(clave_cache(self.excel), clave)
+        with mock.patch.object(_excel, 'VERSION_CACHE', _excel.VERSION_CACHE + 1):
+            self.assertNotEqual(clave_cache(self.excel), clave)
+
+    def test_dry_run_sin_cache(self):
+        leer_inventario(self.excel)
+        with mock.patch.object(_excel, '_leer', wraps=_excel._leer) as leer:
+            out = io.StringIO()
+            call_command('import_mapa', excel=self.excel, images_dir=self.cache_dir, dry_run=True,
+                         stdout=out)
+            self.assertIn('(caché)', out.getvalue())
+            leer.assert_not_called()
+            out = io.StringIO()
+            call_command('import_mapa', excel=self.excel, images_dir=self.cache_dir, dry_run=True,
+                         sin_cache=True, stdout=out)
+            self.assertIn(f'({_excel.motor()})', out.getvalue())
+            leer.assert_called_once()
@@ -0,0 +1,148 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+import pandas as pd
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from api.dataset import DatasetState
+from api.management.commands import import_mapa
+from api.management.commands._sintetico import escribir_excel, inventario
+from api.management.commands.import_mapa import IMAGE_COLS, Command
+
+
+class FakeCypher:
+    """db.cypher_query que responde con las piezas/componentes guardados y anota los DELETE."""
+
+    def __init__(self, piezas, componentes):
+        self.piezas, self.componentes = piezas, componentes
+        self.borrados = []
+
+    def __call__(self, query, params=None):
+        if 'RETURN p.numero_inventario, p.row_hash' in query:
+            return [list(r) for r in self.piezas.items()], None
+        if 'RETURN c.pieza_numero_inventario, c.letra, c.row_hash' in query:
+            return [[n, l, h] for (n, l), h in self.componentes.items()], None
+        if 'DELETE' in query:
+            self.borrados.append((query, params))
+            return [], None
+        raise AssertionError(f'consulta inesperada: {query}')
+
+
+class ApplyDeltaTests(SimpleTestCase):
+    def setUp(self):
+        self.piezas = pd.DataFrame({
+            'numero_inventario': ['1', '2', '3'],
+            'row_hash': ['p1', 'p2', 'p3'],
+        })
+        self.comp = pd.DataFrame({
+            'pieza_numero_inventario': ['2', '2'],
+            'letra': ['a', 'b'],
+            'row_hash': ['c2a', 'c2b'],
+        })
+        self.img = pd.DataFrame([
+            ('00001.jpg', '1', '', 'h1', 10, 1.0),
+            ('00002a.jpg', '2', 'a', 'h2a', 10, 1.0),
+            ('00003.jpg', '3', '', 'h3', 10, 1.0),
+        ], columns=IMAGE_COLS)
+        # Lo que ya tiene el slot: igual al Excel y a la carpeta de imágenes
+        self.old_p = dict(zip(self.piezas['numero_inventario'], self.piezas['row_hash']))
+        self.old_c = {('2', 'a'): 'c2a', ('2', 'b'): 'c2b'}
+        self.old_i = {fn: (h, s, m) for fn, _, _, h, s, m in self.img.itertuples(index=False)}
+
+    def _delta(self):
+        fake = FakeCypher(self.old_p, self.old_c)
+        with mock.patch.object(import_mapa.db, 'cypher_query', fake):
+            cmd = Command(stdout=io.StringIO())
+            piezas, comp, img = cmd._apply_delta('green', self.piezas, self.comp, self.img, self.old_i)
+        return piezas, comp, img, fake.borrados
+
+    def test_sin_cambios_no_reescribe_nada(self):
+        piezas, comp, img, borrados = self._delta()
+        self.assertTrue(piezas.empty)
+        self.assertTrue(comp.empty)
+        self.assertTrue(img.empty)
+        self.assertEqual(borrados, [])
+
+    def test_fila_cambiada_recrea_solo_esa_pieza(self):
+        self.piezas.loc[1, 'row_hash'] = 'p2-nuevo'
+        piezas, comp, img, borrados = self._delta()
+        self.assertEqual(list(piezas['numero_inventario']), ['2'])
+        # Sus componentes y su imagen vuelven a cargarse con ella
+        self.assertEqual(list(zip(comp['pieza_numero_inventario'], comp['letra'])), [('2', 'a'), ('2', 'b')])
+        self.assertEqual(list(img['file_name']), ['00002a.jpg'])
+        nums = [p['nums'] for _, p in borrados]
+        self.assertEqual(nums, [['2'], ['2']])   # la pieza y sus componentes
+        self.assertTrue(all(p['slot'] == 'green' for _, p in borrados))
+
+    def test_hash_de_imagen_cambiado_recarga_solo_esa_imagen(self):
+        self.img.loc[2, 'file_hash'] = 'h3-nuevo'
+        piezas, comp, img, borrados = self._delta()
+        self.assertTrue(piezas.empty)
+        self.assertTrue(comp.empty)
+        self.assertEqual(list(img['file_name']), ['00003.jpg'])
+        self.assertEqual(borrados, [])
+
+    def test_bajas(self):
+        self.piezas = self.piezas[self.piezas['numero_inventario'] != '3']
+        self.comp = self.comp[self.comp['letra'] != 'b']
+        self.img = self.img[self.img['num'] != '3']
+        piezas, comp, img, borrados = self._delta()
+        self.assertTrue(piezas.empty and comp.empty and img.empty)
+        params = [p for _, p in borrados]
+        self.assertEqual(params[0]['nums'], ['3'])
+        self.assertIn({'slot': 'green', 'keys': [['2', 'b']]}, params)
+        self.assertIn({'slot': 'green', 'names': ['00003.jpg']}, params)
+
+
+class IncrementalSlotTests(SimpleTestCase):
+    """--incremental escribe en el slot inactivo y sólo publica si la validación pasa."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.excel = os.path.join(tmp.name, 'inventario.xlsx')
+        escribir_excel(self.excel, inventario(3))
+        self.imagenes = os.path.join(tmp.name, 'imagenes')
+        os.makedirs(self.imagenes)
+
+        vacio = pd.DataFrame(columns=IMAGE_COLS)
+        patches = [
+            mock.patch.object(import_mapa, 'current_dataset', return_value=DatasetState('v1', 'blue', 'green')),
+            mock.patch.object(import_mapa, 'activate'),
+            mock.patch.object(Command, '_apply_delta', side_effect=lambda slot, p, c, i, old: (p[:0], c[:0], i)),
+            mock.patch.object(Command, '_stored_images', return_value={}),
+            mock.patch.object(Command, '_scan_images', return_value=vacio),
+            mock.patch.object(Command, '_validate_slot'),
+        ]
+        for nombre in ('_create_schema', '_wipe_slot', '_create_domains', '_load_piezas',
+                       '_load_componentes', '_load_imagenes', '_backfill_imagen_keys',
+                       '_purge_orphan_domains', '_write_aux', '_purge_legacy'):
+            patches.append(mock.patch.object(Command, nombre))
+        self.mocks = {}
+        for p in patches:
+            m = p.start()
+            self.addCleanup(p.stop)
+            self.mocks[p.attribute] = m
+
+    def _importar(self):
+        call_command(
+            'import_mapa', excel=self.excel, images_dir=self.imagenes, incremental=True,
+            sin_cache=True, stdout=io.StringIO(),
+        )
+
+    def test_delta_en_slot_inactivo_y_publica(self):
+        self._importar()
+        self.assertEqual(self.mocks['_apply_delta'].call_args.args[0], 'green')
+        self.mocks['_wipe_slot'].assert_not_called()
+        self.assertEqual(self.mocks['_validate_slot'].call_args.args[0], 'green')
+        self.mocks['activate'].assert_called_once_with('green')
+
+    def test_validacion_fallida_no_publica(self):
+        self.mocks['_validate_slot'].side_effect = CommandError('no cuadra')
+        with self.assertRaises(CommandError):
+            self._importar()
+        self.mocks['activate'].assert_not_called()
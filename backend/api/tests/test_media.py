@@ -0,0 +1,128 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from api import media
+from api.dataset import DatasetState
+from api.media import CACHE_INMUTABLE, CACHE_REVALIDAR, _parse_range
+
+FILE_HASH = '0123456789abcdef0123456789abcdef'
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_tramo_cerrado(self):
+        self.assertEqual(_parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(_parse_range('bytes=900-5000', 1000), (900, 999))
+
+    def test_abierto(self):
+        self.assertEqual(_parse_range('bytes=500-', 1000), (500, 999))
+
+    def test_sufijo(self):
+        self.assertEqual(_parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(_parse_range('bytes=-5000', 1000), (0, 999))
+
+    def test_fuera_de_rango(self):
+        with self.assertRaises(ValueError):
+            _parse_range('bytes=1000-', 1000)
+        with self.assertRaises(ValueError):
+            _parse_range('bytes=-0', 1000)
+
+    def test_no_aplica(self):
+        # Varios tramos, unidades desconocidas o fin < inicio: se responde el archivo completo
+        self.assertIsNone(_parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(_parse_range('items=0-1', 1000))
+        self.assertIsNone(_parse_range('bytes=-', 1000))
+        self.assertIsNone(_parse_range('bytes=50-10', 1000))
+
+
+@override_settings(MEDIA_SERVE_MODE='django')
+class MediaViewTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, '00027.jpg')
+        with open(path, 'wb') as f:
+            f.write(bytes(range(256)) * 4)
+        self.st = os.stat(path)
+        settings = override_settings(MEDIA_ROOT=tmp.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        for patcher in (
+            mock.patch.object(media, 'current_dataset', return_value=DatasetState('v1', 'blue', None)),
+            mock.patch.object(media, '_hashes', {}),
+            mock.patch.object(media, '_sin_neo4j_hasta', [0.0]),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.guardada = [FILE_HASH, self.st.st_size, self.st.st_mtime]
+
+    def _get(self, url, **headers):
+        filas = [['00027.jpg'] + self.guardada]
+        with mock.patch.object(media, 'read_query', return_value=(filas, None)):
+            return self.client.get(url, headers=headers)
+
+    def test_v_vigente_es_inmutable(self):
+        resp = self._get(f'/imagenes/00027.jpg?v={FILE_HASH[:16]}')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Cache-Control'], CACHE_INMUTABLE)
+        self.assertEqual(resp['ETag'], f'"{FILE_HASH}"')
+
+    def test_v_viejo_se_revalida(self):
+        resp = self._get('/imagenes/00027.jpg?v=ffffffffffffffff')
+        self.assertEqual(resp['Cache-Control'], CACHE_REVALIDAR)
+        resp = self._get('/imagenes/00027.jpg')
+        self.assertEqual(resp['Cache-Control'], CACHE_REVALIDAR)
+
+    def test_archivo_cambiado_sin_reimportar(self):
+        self.guardada = [FILE_HASH, self.st.st_size + 1, self.st.st_mtime]
+        resp = self._get(f'/imagenes/00027.jpg?v={FILE_HASH[:16]}')
+        self.assertEqual(resp['Cache-Control'], CACHE_REVALIDAR)
+        self.assertTrue(resp['ETag'].startswith('W/'))
+
+    def test_if_range_con_etag_fuerte(self):
+        resp = self._get('/imagenes/00027.jpg', Range='bytes=0-9', If_Range=f'"{FILE_HASH}"')
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/1024')
+        self.assertEqual(b''.join(resp.streaming_content), bytes(range(10)))
+
+    def test_if_range_viejo_responde_completo(self):
+        resp = self._get('/imagenes/00027.jpg', Range='bytes=0-9', If_Range='"otro"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_rango_no_satisfacible(self):
+        resp = self._get('/imagenes/00027.jpg', Range='bytes=5000-')
+        self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp['Content-Range'], 'bytes */1024')
+
+    def test_if_none_match(self):
+        resp = self._get('/imagenes/00027.jpg', If_None_Match=f'"{FILE_HASH}"')
+        self.assertEqual(resp.status_code, 304)
+
+    def test_una_consulta_por_version(self):
+        with mock.patch.object(media, 'read_query', return_value=([['00027.jpg'] + self.guardada], None)) as rq:
+            for _ in range(3):
+                self.assertEqual(self.client.get('/imagenes/00027.jpg')['ETag'], f'"{FILE_HASH}"')
+            self.assertEqual(rq.call_count, 1)
+            media.current_dataset.return_value = DatasetState('v2', 'green', 'blue')
+            self.client.get('/imagenes/00027.jpg')
+            self.assertEqual(rq.call_count, 2)
+            self.assertEqual(rq.call_args.args[1], {'dataset': 'green'})
+        self.assertEqual(list(media._hashes), ['v2'])
+
+    def test_sin_neo4j_se_sirve_con_etag_debil(self):
+        with mock.patch.object(media, 'read_query', side_effect=ConnectionError('neo4j caído')) as rq, \
+                self.assertLogs('api.media', 'WARNING'):
+            for _ in range(3):
+                resp = self.client.get(f'/imagenes/00027.jpg?v={FILE_HASH[:16]}')
+                self.assertEqual(resp.status_code, 200)
+                self.assertTrue(resp['ETag'].startswith('W/'))
+                self.assertEqual(resp['Cache-Control'], CACHE_REVALIDAR)
+        # No se reintenta en cada imagen mientras dura DATASET_VERSION_TTL
+        self.assertEqual(rq.call_count, 1)
+
+    def test_imagen_sin_hash_guardado(self):
+        with mock.patch.object(media, 'read_query', return_value=([], None)):
+            resp = self.client.get('/imagenes/00027.jpg')
+        self.assertTrue(resp['ETag'].startswith('W/'))
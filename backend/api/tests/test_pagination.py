@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api import views
+from api.pagination import KeysetPagination
+
+factory = APIRequestFactory()
+
+
+class FakeResultSet:
+    """CypherResultSet.seek sobre una lista ordenada de claves (sin Neo4j)."""
+
+    def __init__(self, claves):
+        self.claves = sorted(claves)
+        self.llamadas = []
+
+    def seek(self, key, after=None, limit=10, reverse=False):
+        self.llamadas.append((after, limit, reverse))
+        if reverse:
+            filas = [k for k in reversed(self.claves) if after is None or k < after][:limit]
+            filas.reverse()
+        else:
+            filas = [k for k in self.claves if after is None or k > after][:limit]
+        return [(k, f'pieza {k}') for k in filas]
+
+
+class KeysetPaginationTests(SimpleTestCase):
+    def setUp(self):
+        self.rs = FakeResultSet([1, 2, 3, 5, 8, 13, 21, 34])   # 8 piezas, páginas de 3
+
+    def _pagina(self, url='/api/piezas/?cursor='):
+        paginator = KeysetPagination()
+        paginator.page_size = 3
+        page = paginator.paginate_queryset(self.rs, Request(factory.get(url)))
+        return page, paginator.get_next_link(), paginator.get_previous_link()
+
+    def test_primera_pagina(self):
+        page, next_url, prev_url = self._pagina()
+        self.assertEqual(page, ['pieza 1', 'pieza 2', 'pieza 3'])
+        self.assertIsNotNone(next_url)
+        self.assertIsNone(prev_url)
+        self.assertEqual(self.rs.llamadas, [(None, 4, False)])
+
+    def test_recorrido_completo_hacia_adelante(self):
+        paginas, url = [], '/api/piezas/?cursor='
+        while url:
+            page, url, _ = self._pagina(url)
+            paginas.append(page)
+        self.assertEqual(paginas, [
+            ['pieza 1', 'pieza 2', 'pieza 3'],
+            ['pieza 5', 'pieza 8', 'pieza 13'],
+            ['pieza 21', 'pieza 34'],
+        ])
+        # Cada página busca desde la última clave vista, sin SKIP
+        self.assertEqual([a for a, _, _ in self.rs.llamadas], [None, 3, 13])
+
+    def test_pagina_intermedia_y_ultima(self):
+        _, next_url, _ = self._pagina()
+        page, next_url, prev_url = self._pagina(next_url)
+        self.assertEqual(page, ['pieza 5', 'pieza 8', 'pieza 13'])
+        self.assertIsNotNone(next_url)
+        self.assertIsNotNone(prev_url)
+        page, next_url, prev_url = self._pagina(next_url)
+        self.assertEqual(page, ['pieza 21', 'pieza 34'])
+        self.assertIsNone(next_url)
+        self.assertIsNotNone(prev_url)
+
+    def test_anterior_desde_el_medio(self):
+        _, next_url, _ = self._pagina()
+        _, next_url, _ = self._pagina(next_url)
+        _, _, prev_url = self._pagina(next_url)      # desde la última
+        page, next_url, prev_url = self._pagina(prev_url)
+        self.assertEqual(page, ['pieza 5', 'pieza 8', 'pieza 13'])
+        self.assertEqual(self.rs.llamadas[-1], (21, 4, True))
+        self.assertIsNotNone(prev_url)
+        page, _, _ = self._pagina(next_url)
+        self.assertEqual(page, ['pieza 21', 'pieza 34'])
+
+    def test_anterior_hasta_el_inicio(self):
+        _, next_url, _ = self._pagina()
+        _, _, prev_url = self._pagina(next_url)
+        page, next_url, prev_url = self._pagina(prev_url)
+        self.assertEqual(page, ['pieza 1', 'pieza 2', 'pieza 3'])
+        self.assertIsNone(prev_url)
+        page, _, _ = self._pagina(next_url)
+        self.assertEqual(page, ['pieza 5', 'pieza 8', 'pieza 13'])
+
+    def test_anterior_antes_del_primero(self):
+        # Cursor hacia atrás desde la primera clave: página vacía cuyo `next` vuelve al inicio
+        paginator = KeysetPagination()
+        paginator.page_size = 3
+        paginator.base_url = 'http://testserver/api/piezas/'
+        cursor = paginator.encode_cursor(Cursor(offset=0, reverse=True, position='1'))
+        page, next_url, prev_url = self._pagina(cursor)
+        self.assertEqual(page, [])
+        self.assertIsNone(prev_url)
+        page, _, _ = self._pagina(next_url)
+        self.assertEqual(page, ['pieza 1', 'pieza 2', 'pieza 3'])
+
+    def test_cursor_invalido(self):
+        for cursor in ('basura', 'cD1hYmM%3D'):   # no es base64 / posición no numérica ("p=abc")
+            with self.assertRaises(NotFound):
+                self._pagina(f'/api/piezas/?cursor={cursor}')
+        self.assertEqual(self.rs.llamadas, [])
+
+
+class PiezaCursorTests(SimpleTestCase):
+    def test_cursor_con_q_se_rechaza(self):
+        with mock.patch.object(views, 'current_slot', return_value='blue'), \
+                mock.patch.object(views, 'read_query') as rq, \
+                mock.patch('api.pagination.read_query') as rq_pag:
+            resp = self.client.get('/api/piezas/', {'cursor': '', 'q': 'ceramica'})
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('cursor', resp.json())
+        rq.assert_not_called()
+        rq_pag.assert_not_called()
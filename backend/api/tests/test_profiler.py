@@ -0,0 +1,33 @@
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from api import profiler
+
+LENTA = 'MATCH (p:Pieza) WHERE p.dataset = $dataset RETURN count(p)'
+
+
+class ConsultaLentaTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(profiler, '_perfilados', set())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sin_profile_por_omision(self):
+        self.assertFalse(settings.CYPHER_PROFILE_SLOW)
+        with mock.patch.object(profiler, '_profile') as profile, \
+                self.assertLogs('api.cypher', 'WARNING') as logs:
+            profiler._consulta_lenta(LENTA, {}, 900.0, 1)
+        profile.assert_not_called()
+        self.assertIn('consulta lenta 900.0 ms', logs.output[0])
+
+    @override_settings(CYPHER_PROFILE_SLOW=True)
+    def test_profile_una_vez_y_solo_lecturas(self):
+        with mock.patch.object(profiler, '_profile', return_value='NodeByLabelScan') as profile, \
+                self.assertLogs('api.cypher', 'WARNING') as logs:
+            profiler._consulta_lenta(LENTA, {}, 900.0, 1)
+            profiler._consulta_lenta(LENTA, {}, 900.0, 1)
+            profiler._consulta_lenta('MATCH (i:Imagen) DETACH DELETE i', {}, 900.0, 0)
+        self.assertEqual(profile.call_count, 1)
+        self.assertIn('NodeByLabelScan', logs.output[0])
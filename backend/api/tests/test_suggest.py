@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from api import suggest
+from api.suggest import SuggestIndex, suggest_index
+
+
+def nombres(items):
+    return [i['nombre'] for i in items]
+
+
+class SuggestIndexTests(SimpleTestCase):
+    def test_sin_tildes_ni_mayusculas(self):
+        index = SuggestIndex([('Pérez, Juan', 3), ('Ñuñoa', 2)])
+        self.assertEqual(nombres(index.buscar('PER', 10)), ['Pérez, Juan'])
+        self.assertEqual(nombres(index.buscar('pér', 10)), ['Pérez, Juan'])
+        self.assertEqual(nombres(index.buscar('nun', 10)), ['Ñuñoa'])
+
+    def test_desde_el_inicio_de_cada_palabra(self):
+        index = SuggestIndex([('Pérez, Juan', 3), ('San Juan', 1)])
+        self.assertEqual(nombres(index.buscar('juan', 10)), ['Pérez, Juan', 'San Juan'])
+        self.assertEqual(nombres(index.buscar('san j', 10)), ['San Juan'])
+        # No encuentra texto en medio de una palabra
+        self.assertEqual(index.buscar('erez', 10), [])
+        self.assertEqual(index.buscar('uan', 10), [])
+
+    def test_ranking_por_piezas(self):
+        index = SuggestIndex([('Ana Soto', 1), ('Ana Ruiz', 9), ('ana Ana', 4), ('Beatriz', 50)])
+        self.assertEqual(
+            index.buscar('ana', 10),
+            [{'nombre': 'Ana Ruiz', 'count': 9}, {'nombre': 'ana Ana', 'count': 4},
+             {'nombre': 'Ana Soto', 'count': 1}],
+        )
+        # Prefijo vacío: todos, por piezas
+        self.assertEqual(nombres(index.buscar('', 2)), ['Beatriz', 'Ana Ruiz'])
+
+    def test_empates_por_nombre_y_repetidos_sumados(self):
+        index = SuggestIndex([('beta', 2), ('Alfa', 2), (' Alfa ', 0), ('Alfa', 1), ('', 7), (None, 7)])
+        self.assertEqual(index.buscar('', 10), [{'nombre': 'Alfa', 'count': 3}, {'nombre': 'beta', 'count': 2}])
+
+    def test_top_k(self):
+        index = SuggestIndex([(f'Nombre {i:02d}', i) for i in range(30)], k=5)
+        self.assertEqual(
+            nombres(index.buscar('nom', 20)), ['Nombre 29', 'Nombre 28', 'Nombre 27', 'Nombre 26', 'Nombre 25']
+        )
+        self.assertEqual(nombres(index.buscar('nombre 0', 3)), ['Nombre 09', 'Nombre 08', 'Nombre 07'])
+
+
+class SuggestCacheTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(suggest._indices, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_se_rehace_al_cambiar_la_version(self):
+        filas = {'blue': [('Pérez, Juan', 3)], 'green': [('Rojas, Ana', 5)]}
+        with mock.patch.object(suggest, 'read_query',
+                               side_effect=lambda q, p: (filas[p['dataset']], None)) as rq:
+            v1 = suggest_index('autor', 'v1', 'blue')
+            self.assertIs(suggest_index('autor', 'v1', 'blue'), v1)
+            self.assertEqual(rq.call_count, 1)
+
+            v2 = suggest_index('autor', 'v2', 'green')
+            self.assertIsNot(v2, v1)
+            self.assertEqual(rq.call_count, 2)
+            self.assertEqual(nombres(v2.buscar('ro', 10)), ['Rojas, Ana'])
+            self.assertEqual(v2.buscar('per', 10), [])
+        # La versión anterior del mismo campo se descarta
+        self.assertEqual(list(suggest._indices), [('autor', 'v2')])
+
+    def test_vista(self):
+        with mock.patch('api.views.current_dataset', return_value=('v1', 'blue', None)), \
+                mock.patch.object(suggest, 'read_query', return_value=([('Pérez, Juan', 3)], None)):
+            resp = self.client.get('/api/suggest/', {'field': 'autor', 'prefix': 'JUAN'})
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(resp.json(), [{'nombre': 'Pérez, Juan', 'count': 3}])
+            self.assertEqual(self.client.get('/api/suggest/', {'field': 'nada'}).status_code, 400)
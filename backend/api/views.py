@@ -1,20 +1,60 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+
+from django.core.cache import cache
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from django.conf import settings
 from neomodel import db
-
-from .models import (
-    Pieza, Componente, Imagen, Autor, Pais,
-    Localidad, Material, Coleccion
-)
-
+from neomodel.exceptions import ConstraintValidationFailed, UniqueProperty
+
+from .models import Imagen
+
+from .busqueda import INDICE_TEXTO, fulltext_query
+from .dataset import current_dataset, current_slot
+from .derivados import RENDICIONES, content_type, derivado_path, generar
+from .media import hash_vigente, imagen_uid, media_path, serve_file
+from .neo import pool_stats, read_query, stream_query
+from .pagination import CypherResultSet, KeysetPagination
+from .prefetch import COMPONENTE_PREFETCH, PIEZA_EXPORT, PIEZA_PREFETCH, inflate_componente, inflate_pieza
+from .suggest import CAMPOS as SUGGEST_CAMPOS, TOP_K as SUGGEST_TOP_K, suggest_index
 from .serializers import (
-    PiezaOutSerializer, ComponenteOutSerializer,
-    ImagenOutSerializer, ImagenListSerializer, PiezaExportSerializer
+    PiezaOutSerializer, ComponenteOutSerializer, ImagenOutSerializer, PiezaExportSerializer
 )
 
+EXPORT_STREAMS = ('ndjson', 'csv')
+FILE_HASH_RE = re.compile(r'[0-9a-f]{32}')
+FACETAS = ('coleccion', 'pais', 'autor', 'localidad', 'tipologia')
+
+
+def _csv_lines(fields, records):
+    """Genera el CSV línea a línea; las listas (materiales) van unidas con '; '."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def flush():
+        line = buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+        return line
+
+    writer.writerow(fields)
+    yield flush()
+    for r in records:
+        writer.writerow([
+            "; ".join(v) if isinstance(v, list) else ("" if v is None else v)
+            for v in (r[f] for f in fields)
+        ])
+        yield flush()
 
 
 class PiezaViewSet(viewsets.ViewSet):
@@ -24,6 +64,7 @@ class PiezaViewSet(viewsets.ViewSet):
         autores     = request.query_params.getlist('autor__nombre')
         localidades = request.query_params.getlist('localidad__nombre')
         tipologias  = request.query_params.getlist('tipologia')
+        texto       = fulltext_query(request.query_params.get('q'))
 
         def _norm_list(xs):
             return [x.strip().lower() for x in xs if str(x).strip() != ""]
@@ -34,50 +75,91 @@ class PiezaViewSet(viewsets.ViewSet):
             "autores":     _norm_list(autores),
             "localidades": _norm_list(localidades),
             "tipologias":  _norm_list(tipologias),
+            "texto":       texto,
+            "dataset":     current_slot(),
         }
 
-    def _cypher_base(self):
-        return """
-        MATCH (p:Pieza)
-        OPTIONAL MATCH (p)-[:PERTENECE_A]->(c:Coleccion)
-        WITH p, collect(DISTINCT toLower(trim(c.nombre))) AS cols
-        OPTIONAL MATCH (p)-[:PROCEDENTE_DE]->(pa:Pais)
-        WITH p, cols, collect(DISTINCT toLower(trim(pa.nombre))) AS pais_list
-        OPTIONAL MATCH (p)-[:CREADO_POR]->(a:Autor)
-        WITH p, cols, pais_list, collect(DISTINCT toLower(trim(a.nombre))) AS aut_list
-        OPTIONAL MATCH (p)-[:LOCALIZADO_EN]->(l:Localidad)
-        WITH p, cols, pais_list, aut_list, collect(DISTINCT toLower(trim(l.nombre))) AS loc_list
-
-        WHERE (
-            size($colecciones) = 0 OR any(x IN $colecciones WHERE x IN cols)
-        )
-        AND (
-            size($paises) = 0 OR any(x IN $paises WHERE x IN pais_list)
-        )
-        AND (
-            size($autores) = 0 OR any(x IN $autores WHERE x IN aut_list)
-        )
-        AND (
-            size($localidades) = 0 OR any(x IN $localidades WHERE x IN loc_list)
-        )
-        AND (
-            size($tipologias) = 0 OR toLower(trim(coalesce(p.tipologia, ''))) IN $tipologias
-        )
+    # (clave en params, label del dominio, relación desde la pieza)
+    _FILTROS_DOMINIO = (
+        ('colecciones', 'Coleccion', 'PERTENECE_A'),
+        ('paises',      'Pais',      'PROCEDENTE_DE'),
+        ('autores',     'Autor',     'CREADO_POR'),
+        ('localidades', 'Localidad', 'LOCALIZADO_EN'),
+    )
 
-        RETURN p
+    def _cypher_filter(self, params):
+        """
+        MATCH/WHERE que deja ligada `p` a las piezas que cumplen los filtros.
+
+        Con `?q=` se entra por el índice full-text (api/busqueda.py), que
+        además deja ligado `score`. Si no, el primer filtro de dominio activo
+        entra por el índice de `nombre_norm` (escrito por import_mapa) y
+        recorre hacia sus piezas. Los demás filtros se intersectan con EXISTS
+        sobre esas piezas y los vacíos no agregan ninguna cláusula. Sólo se lee
+        el slot activo (`$dataset`): como las relaciones no cruzan slots, basta
+        con acotar el punto de entrada.
+        """
+        match, where = None, []
+        if params['texto']:
+            match = (
+                f"CALL db.index.fulltext.queryNodes('{INDICE_TEXTO}', $texto) "
+                f"YIELD node AS p, score"
+            )
+            where.append("p.dataset = $dataset")
+        for key, label, rel in self._FILTROS_DOMINIO:
+            if not params[key]:
+                continue
+            if match is None:
+                match = (
+                    f"MATCH (d:{label}) WHERE d.nombre_norm IN ${key} AND d.dataset = $dataset\n"
+                    f"        MATCH (p:Pieza)-[:{rel}]->(d)\n"
+                    f"        WITH DISTINCT p"
+                )
+            else:
+                where.append(
+                    f"EXISTS {{ MATCH (p)-[:{rel}]->(x:{label}) WHERE x.nombre_norm IN ${key} }}"
+                )
+        if match is None:
+            where.insert(0, "p.dataset = $dataset")
+        if params['tipologias']:
+            where.append("p.tipologia_norm IN $tipologias")
+
+        q = f"""
+        {match or "MATCH (p:Pieza)"}"""
+        if where:
+            q += """
+        WHERE """ + "\n          AND ".join(where)
+        return q + "\n"
+
+    def _cypher_base(self, params, returns='p'):
+        return self._cypher_filter(params) + f"""
+        WITH p
         ORDER BY p.numero_inventario_int
+        RETURN {returns}
         """
 
     def list(self, request):
         params = self._parse_filters(request)
-        q = self._cypher_base()
-
-        rows, _ = db.cypher_query(q, params)
-        piezas = [Pieza.inflate(r[0]) for r in rows]
+        # SKIP/LIMIT y el total se resuelven en Neo4j; cada página trae sus
+        # relaciones en la misma consulta (api/prefetch.py).
+        # Con búsqueda de texto, las más relevantes primero
+        orden = {}
+        if params['texto']:
+            orden = {'keep': ('score',), 'order_by': 'score DESC, p.numero_inventario_int'}
+        piezas = CypherResultSet(
+            self._cypher_filter(params), params,
+            returns=PIEZA_PREFETCH, to_python=inflate_pieza, **orden,
+        )
 
-        paginator = PageNumberPagination()
+        if 'cursor' in request.query_params:
+            # ?cursor= (vacío para la primera página): keyset sobre numero_inventario_int
+            if params['texto']:
+                raise ValidationError({'cursor': "No se puede combinar con ?q= (orden por relevancia)."})
+            paginator = KeysetPagination()
+        else:
+            paginator = PageNumberPagination()
         paginator.page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
-        page = paginator.paginate_queryset(list(piezas), request)
+        page = paginator.paginate_queryset(piezas, request)
         ser = PiezaOutSerializer(page, many=True, context={'request': request})
         return paginator.get_paginated_response(ser.data)
 
@@ -86,81 +168,311 @@ class PiezaViewSet(viewsets.ViewSet):
         """
         Devuelve TODAS las piezas que cumplen los filtros, SIN paginar.
         Pensado para selección masiva/exportación en el front sin múltiples requests.
+
+        Con `?stream=ndjson` o `?stream=csv` la respuesta se va escribiendo a
+        medida que Neo4j entrega las filas, con memoria constante.
         """
         params = self._parse_filters(request)
-        q = self._cypher_base()
+        q = self._cypher_base(params, returns=PIEZA_EXPORT)
 
-        rows, _ = db.cypher_query(q, params)
-        piezas = [Pieza.inflate(r[0]) for r in rows]
+        stream = request.query_params.get('stream')
+        if stream:
+            if stream not in EXPORT_STREAMS:
+                raise ValidationError({'stream': f"Valores permitidos: {', '.join(EXPORT_STREAMS)}"})
+            return self._export_stream(q, params, stream)
 
-        ser = PiezaExportSerializer(piezas, many=True, context={'request': request})
+        rows, keys = read_query(q, params)
+        ser = PiezaExportSerializer([dict(zip(keys, r)) for r in rows], many=True)
         return Response(ser.data)
 
+    def _export_stream(self, q, params, stream):
+        ser = PiezaExportSerializer()
+        fields = list(ser.fields)
+
+        def records():
+            for row in stream_query(q, params):
+                yield ser.to_representation(row)
+
+        if stream == 'ndjson':
+            body = (json.dumps(r, ensure_ascii=False) + "\n" for r in records())
+            content_type = 'application/x-ndjson; charset=utf-8'
+        else:
+            body = _csv_lines(fields, records())
+            content_type = 'text/csv; charset=utf-8'
+
+        response = StreamingHttpResponse(body, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="piezas.{stream}"'
+        return response
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """
+        Cuántas piezas hay por colección, país, autor, localidad y tipología
+        bajo los mismos filtros de `list`. Una sola pasada agregada en Cypher,
+        cacheada por versión del dataset y combinación de filtros.
+        """
+        params = self._parse_filters(request)
+        estado = current_dataset()
+        norm = {k: sorted(set(v)) for k, v in params.items() if isinstance(v, list)}
+        norm['texto'] = params['texto']
+        digest = hashlib.sha1(json.dumps(norm, sort_keys=True).encode()).hexdigest()
+        key = f"facets:{estado.version}:{digest}"
+
+        data = cache.get(key)
+        if data is None:
+            data = self._facet_counts(dict(norm, dataset=estado.slot))
+            cache.set(key, data, settings.FACETS_CACHE_TIMEOUT)
+        return Response(data)
+
+    def _facet_counts(self, params):
+        q = self._cypher_filter(params) + """
+        WITH p
+        UNWIND (
+            [['_total', '']] +
+            [(p)-[:PERTENECE_A]->(x:Coleccion) | ['coleccion', x.nombre]] +
+            [(p)-[:PROCEDENTE_DE]->(x:Pais) | ['pais', x.nombre]] +
+            [(p)-[:CREADO_POR]->(x:Autor) | ['autor', x.nombre]] +
+            [(p)-[:LOCALIZADO_EN]->(x:Localidad) | ['localidad', x.nombre]] +
+            [['tipologia', coalesce(p.tipologia, '')]]
+        ) AS fv
+        WITH fv[0] AS faceta, trim(coalesce(fv[1], '')) AS nombre, count(DISTINCT p) AS n
+        WHERE faceta = '_total' OR nombre <> ''
+        RETURN faceta, nombre, n
+        """
+        rows, _ = read_query(q, params)
+
+        total = 0
+        facets = {f: [] for f in FACETAS}
+        for faceta, nombre, n in rows:
+            if faceta == '_total':
+                total = n
+            else:
+                facets[faceta].append({"nombre": nombre, "count": n})
+        for values in facets.values():
+            values.sort(key=lambda v: v["nombre"].casefold())
+        return {"count": total, "facets": facets}
+
+    @action(detail=False, methods=['get', 'post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Varias piezas completas en una sola consulta, en el orden pedido:
+        `?ids=12,5,40` o POST {"ids": [12, 5, 40]} o [12, 5, 40] (números de
+        inventario). Pensado para las vistas de comparación/impresión del
+        front. Los números que no existen se devuelven en `missing`.
+        """
+        if request.method == 'POST':
+            data = request.data
+            if isinstance(data, list):
+                ids = data
+            elif isinstance(data, dict):
+                ids = data.get('ids') or []
+            else:
+                raise ValidationError({'ids': 'El cuerpo debe ser {"ids": [...]} o una lista.'})
+            if not isinstance(ids, list):
+                raise ValidationError({'ids': 'Debe ser una lista.'})
+        else:
+            ids = [x for v in request.query_params.getlist('ids') for x in v.split(',')]
+        try:
+            nums = list(dict.fromkeys(str(int(str(x).strip())) for x in ids if str(x).strip()))
+        except ValueError:
+            raise ValidationError({'ids': 'Deben ser números de inventario.'})
+        if len(nums) > settings.PIEZAS_BULK_MAX:
+            raise ValidationError({'ids': f'Máximo {settings.PIEZAS_BULK_MAX} piezas por llamada.'})
+
+        q = f"""
+        UNWIND $nums AS num
+        MATCH (p:Pieza {{dataset: $dataset, numero_inventario: num}})
+        RETURN {PIEZA_PREFETCH}, num
+        """
+        rows, _ = read_query(q, {'dataset': current_slot(), 'nums': nums})
+        por_num = {r[-1]: inflate_pieza(r[:-1]) for r in rows}
+        piezas = [por_num[n] for n in nums if n in por_num]
+        return Response({
+            'results': PiezaOutSerializer(piezas, many=True, context={'request': request}).data,
+            'missing': [n for n in nums if n not in por_num],
+        })
+
     def retrieve(self, request, pk=None):
-        pieza = Pieza.nodes.get(numero_inventario=str(int(pk)))
+        q = f"""
+        MATCH (p:Pieza {{dataset: $dataset, numero_inventario: $num}})
+        RETURN {PIEZA_PREFETCH}
+        """
+        rows, _ = read_query(q, {'dataset': current_slot(), 'num': str(int(pk))})
+        if not rows:
+            raise NotFound()
+        pieza = inflate_pieza(rows[0])
         return Response(PiezaOutSerializer(pieza, context={'request': request}).data)
 
 
 # ------- COMPONENTES -------
 class ComponenteViewSet(viewsets.ViewSet):
+    """
+    Componentes del slot activo, paginados en Neo4j. Filtros (repetibles):
+    `pieza_numero_inventario`, `letra`, `material` y `tecnica`. Cada página
+    trae materiales, técnicas e imágenes en la misma consulta.
+    """
+
     def list(self, request):
-        comps = Componente.nodes.all()
-        ser = ComponenteOutSerializer(comps, many=True, context={'request': request})
-        return Response(ser.data)
+        qp = request.query_params
+        params = {
+            'dataset': current_slot(),
+            'piezas': [
+                str(int(x)) if x.strip().isdigit() else x.strip()
+                for x in qp.getlist('pieza_numero_inventario') if x.strip()
+            ],
+            'letras': [x.strip().lower() for x in qp.getlist('letra') if x.strip()],
+            'materiales': [x.strip() for x in qp.getlist('material') if x.strip()],
+            'tecnicas': [x.strip() for x in qp.getlist('tecnica') if x.strip()],
+        }
+        where = ["c.dataset = $dataset"]
+        if params['piezas']:
+            where.append("c.pieza_numero_inventario IN $piezas")
+        if params['letras']:
+            where.append("c.letra IN $letras")
+        if params['materiales']:
+            where.append("EXISTS { MATCH (c)-[:USO_MATERIAL]->(m:Material) WHERE m.nombre IN $materiales }")
+        if params['tecnicas']:
+            where.append("EXISTS { MATCH (c)-[:USO_TECNICA]->(t:Tecnica) WHERE t.nombre IN $tecnicas }")
+
+        comps = CypherResultSet(
+            "MATCH (c:Componente) WHERE " + "\n          AND ".join(where), params,
+            var='c', order_by='c.pieza_numero_inventario_int, c.letra',
+            returns=COMPONENTE_PREFETCH, to_python=lambda row: inflate_componente(row[0]),
+        )
+        paginator = PageNumberPagination()
+        paginator.page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        page = paginator.paginate_queryset(comps, request)
+        ser = ComponenteOutSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(ser.data)
 
     def retrieve(self, request, pk=None):
-        comp = Componente.nodes.get(uid=pk)
-        ser = ComponenteOutSerializer(comp, context={'request': request})
-        return Response(ser.data)
+        # id = número de inventario + letra ("27a"); si no, un uid de neomodel
+        m = re.fullmatch(r'0*(\d+)([A-Za-z]+)', pk or '')
+        if m:
+            match = "MATCH (c:Componente {dataset: $dataset, pieza_numero_inventario: $num, letra: $letra})"
+            params = {'dataset': current_slot(), 'num': m.group(1), 'letra': m.group(2).lower()}
+        else:
+            match = "MATCH (c:Componente {dataset: $dataset, uid: $uid})"
+            params = {'dataset': current_slot(), 'uid': pk}
+        rows, _ = read_query(f"{match}\nRETURN {COMPONENTE_PREFETCH} LIMIT 1", params)
+        if not rows:
+            raise NotFound()
+        comp = inflate_componente(rows[0][0])
+        return Response(ComponenteOutSerializer(comp, context={'request': request}).data)
 
 
 class ImagenViewSet(viewsets.ViewSet):
+    """
+    Imágenes del slot activo. El id de cada una es `Imagen.uid` (derivado de
+    su ruta, ver media.imagen_uid): detalle, modificación y borrado la buscan
+    por índice. El listado se ordena y pagina en Neo4j por `file_name_key`.
+    """
+
     def list(self, request):
-        imgs = sorted(Imagen.nodes.all(), key=lambda i: i.file_name.casefold())
+        imgs = CypherResultSet(
+            "MATCH (i:Imagen) WHERE i.dataset = $dataset", {'dataset': current_slot()},
+            var='i', order_by='i.file_name_key', to_python=lambda row: Imagen.inflate(row[0]),
+        )
         paginator = PageNumberPagination()
         paginator.page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
         page = paginator.paginate_queryset(imgs, request)
+        ser = ImagenOutSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(ser.data)
 
-        start = paginator.page.start_index() - 1
-        counter = {'n': start}
-        def next_img_id():
-            counter['n'] += 1
-            return counter['n']
+    def _get(self, pk):
+        img = Imagen.nodes.get_or_none(dataset=current_slot(), uid=pk)
+        if img is None:
+            raise NotFound()
+        return img
 
-        ser = ImagenListSerializer(page, many=True, context={
-            'request': request,
-            'next_img_id': next_img_id
-        })
-        return paginator.get_paginated_response(ser.data)
+    def _img_json(self, request, img):
+        return ImagenOutSerializer(img, context={'request': request}).data
 
     def retrieve(self, request, pk=None):
-        img = Imagen.nodes.get(id=int(pk))
-        rel = f"{settings.MEDIA_URL}{img.file_name}"
-        url = request.build_absolute_uri(rel)
-        data = {'id': int(pk), 'imagen': url, 'descripcion': img.descripcion or None}
-        return Response(data)
+        with db.read_transaction:
+            img = self._get(pk)
+        return Response(self._img_json(request, img))
 
     def create(self, request):
         data = request.data
-        img = Imagen(file_name=data.get('file_name'), descripcion=data.get('descripcion', '')).save()
-        rel = f"{settings.MEDIA_URL}{img.file_name}"
-        url = request.build_absolute_uri(rel)
-        return Response({'id': 0, 'imagen': url, 'descripcion': img.descripcion or None}, status=status.HTTP_201_CREATED)
+        file_name = (data.get('file_name') or '').strip()
+        if not file_name:
+            raise ValidationError({'file_name': 'Este campo es requerido.'})
+        try:
+            img = Imagen(
+                file_name=file_name, descripcion=data.get('descripcion', ''),
+                uid=imagen_uid(file_name), file_name_key=file_name.casefold(),
+                dataset=current_slot(),
+            ).save()
+        except (UniqueProperty, ConstraintValidationFailed):
+            raise ValidationError({'file_name': 'Ya existe una imagen con ese nombre.'})
+        return Response(self._img_json(request, img), status=status.HTTP_201_CREATED)
 
     def update(self, request, pk=None):
-        img = Imagen.nodes.get(id=int(pk))
+        img = self._get(pk)
         img.descripcion = request.data.get('descripcion', img.descripcion)
         img.save()
-        rel = f"{settings.MEDIA_URL}{img.file_name}"
-        url = request.build_absolute_uri(rel)
-        return Response({'id': int(pk), 'imagen': url, 'descripcion': img.descripcion or None})
+        return Response(self._img_json(request, img))
 
     def destroy(self, request, pk=None):
-        img = Imagen.nodes.get(id=int(pk))
-        img.delete()
+        self._get(pk).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def derivado(request, rendicion, file_hash):
+    """
+    Versión web (thumb/medium/full) de una imagen, por hash de contenido.
+    Si todavía no está en disco se genera desde el original en MEDIA_ROOT
+    (sólo ésa; el juego completo lo arma import_mapa --derivados).
+    """
+    if rendicion not in RENDICIONES or not FILE_HASH_RE.fullmatch(file_hash):
+        raise Http404()
+    path = derivado_path(file_hash, rendicion)
+    if not os.path.exists(path):
+        rows, _ = read_query(
+            "MATCH (i:Imagen) WHERE i.dataset = $dataset AND i.file_hash = $file_hash "
+            "RETURN i.file_name LIMIT 1",
+            {'dataset': current_slot(), 'file_hash': file_hash},
+        )
+        src = os.path.join(settings.MEDIA_ROOT, rows[0][0]) if rows else None
+        if not src or not os.path.isfile(src):
+            raise Http404()
+        generar(src, file_hash, rendiciones=(rendicion,))
+
+    # El contenido de una URL con hash nunca cambia
+    return serve_file(
+        request, path, content_type=content_type(),
+        etag=f'"{file_hash}-{rendicion}"', inmutable=True,
+    )
+
+
+def media(request, path):
+    """
+    Archivos de MEDIA_ROOT (api/media.py). Las imágenes importadas van con un
+    ETag fuerte (su hash de contenido, así If-Range funciona) y las URL que
+    arma la API, con `?v=` igual al comienzo de ese hash, se pueden cachear
+    para siempre. Un `?v=` que no coincide (URL vieja, archivo reemplazado
+    sin reimportar) se revalida.
+    """
+    full = media_path(path)
+    file_hash = hash_vigente(path, os.stat(full))
+    v = request.GET.get('v')
+    return serve_file(
+        request, full, etag=f'"{file_hash}"' if file_hash else None,
+        inmutable=bool(file_hash and v and v == file_hash[:16]),
+    )
+
+
+def neo4j_pool(request):
+    """
+    Estado del pool de conexiones a Neo4j de este proceso (api/neo.py), para
+    dimensionar workers contra NEO4J_MAX_POOL_SIZE. Sólo con DEBUG o staff.
+    """
+    if not (settings.DEBUG or request.user.is_staff):
+        raise Http404()
+    return JsonResponse(pool_stats())
+
+
 # helpers para catálogos
 def _catalog_json(names_iterable):
     names = {(n or "").strip() for n in names_iterable}
@@ -168,35 +480,76 @@ def _catalog_json(names_iterable):
     ordered = sorted(names, key=lambda s: s.casefold())
     return [{"id": i + 1, "nombre": n} for i, n in enumerate(ordered)]
 
-class PaisViewSet(viewsets.ViewSet):
-    def list(self, request):
-        data = _catalog_json(p.nombre for p in Pais.nodes.all())
-        return Response(data)
+class CatalogoViewSet(viewsets.ViewSet):
+    """
+    Lista {id, nombre} de un dominio para los filtros del front.
 
-class ColeccionViewSet(viewsets.ViewSet):
-    def list(self, request):
-        data = _catalog_json(c.nombre for c in Coleccion.nodes.all())
-        return Response(data)
+    Sólo cambia cuando corre import_mapa, así que se cachea por versión del
+    dataset (api/dataset.py) y se responde 304 si el cliente ya tiene esa
+    versión (If-None-Match).
+    """
+    catalogo = None
+    cypher = None   # consulta (sobre el slot $dataset) que devuelve los nombres en la primera columna
 
-class AutorViewSet(viewsets.ViewSet):
     def list(self, request):
-        data = _catalog_json(a.nombre for a in Autor.nodes.all())
-        return Response(data)
+        version, slot, _ = current_dataset()
+        etag = f'"{self.catalogo}-{version}"'
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        key = f"catalogo:{self.catalogo}:{version}"
+        data = cache.get(key)
+        if data is None:
+            rows, _ = read_query(self.cypher, {'dataset': slot})
+            data = _catalog_json(r[0] for r in rows)
+            cache.set(key, data, None)
+        return Response(data, headers={'ETag': etag, 'Cache-Control': 'no-cache'})
+
+class PaisViewSet(CatalogoViewSet):
+    catalogo = 'paises'
+    cypher = "MATCH (n:Pais {dataset: $dataset}) RETURN n.nombre"
+
+class ColeccionViewSet(CatalogoViewSet):
+    catalogo = 'colecciones'
+    cypher = "MATCH (n:Coleccion {dataset: $dataset}) RETURN n.nombre"
+
+class AutorViewSet(CatalogoViewSet):
+    catalogo = 'autores'
+    cypher = "MATCH (n:Autor {dataset: $dataset}) RETURN n.nombre"
+
+class LocalidadViewSet(CatalogoViewSet):
+    catalogo = 'localidades'
+    cypher = "MATCH (n:Localidad {dataset: $dataset}) RETURN n.nombre"
+
+class TipologiaViewSet(CatalogoViewSet):
+    catalogo = 'tipologias'
+    cypher = """
+    MATCH (p:Pieza {dataset: $dataset})
+    WITH trim(coalesce(p.tipologia,'')) AS nombre
+    WHERE nombre <> ''
+    RETURN DISTINCT nombre
+    """
+
+class SuggestViewSet(viewsets.ViewSet):
+    """
+    Autocompletado para los filtros: /api/suggest/?field=autor&prefix=per&limit=10
+
+    Devuelve [{nombre, count}] con los valores cuyo nombre (o alguna de sus
+    palabras) empieza con `prefix`, sin distinguir tildes ni mayúsculas,
+    ordenados por número de piezas. Usa el índice en memoria de api/suggest.py.
+    """
 
-class LocalidadViewSet(viewsets.ViewSet):
     def list(self, request):
-        data = _catalog_json(l.nombre for l in Localidad.nodes.all())
-        return Response(data)
-
-class TipologiaViewSet(viewsets.ViewSet):
-    def list(self, request):
-        q = """
-        MATCH (p:Pieza)
-        WITH trim(coalesce(p.tipologia,'')) AS nombre
-        WHERE nombre <> ''
-        RETURN DISTINCT nombre
-        """
-        rows, _ = db.cypher_query(q)
-        nombres = [r[0] for r in rows]
-        data = _catalog_json(nombres)
-        return Response(data)
+        field = request.query_params.get('field', '')
+        if field not in SUGGEST_CAMPOS:
+            raise ValidationError({'field': f"Valores permitidos: {', '.join(SUGGEST_CAMPOS)}"})
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': 'Debe ser un entero.'})
+        limit = max(1, min(limit, SUGGEST_TOP_K))
+
+        version, slot, _ = current_dataset()
+        index = suggest_index(field, version, slot)
+        data = index.buscar(request.query_params.get('prefix', ''), limit)
+        return Response(data, headers={'Cache-Control': 'no-cache'})
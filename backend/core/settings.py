@@ -28,8 +28,15 @@ if '://' in bolt_url and '@' not in bolt_url:
     bolt_url = f"{scheme}://{user}:{pwd}@{rest}"
 NEO4J_BOLT_URL = bolt_url
 
-from neomodel import config
-config.DATABASE_URL = bolt_url
+# El driver (uno por proceso, con el pool de abajo) lo crea api/neo.py al iniciar la app
+NEO4J_MAX_POOL_SIZE = int(os.getenv('NEO4J_MAX_POOL_SIZE', 50))
+NEO4J_MAX_CONNECTION_LIFETIME = int(os.getenv('NEO4J_MAX_CONNECTION_LIFETIME', 3600))      # s
+NEO4J_CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv('NEO4J_CONNECTION_ACQUISITION_TIMEOUT', 60))  # s
+# Conexiones ociosas por más de estos segundos se verifican antes de usarse (None: nunca)
+NEO4J_LIVENESS_CHECK_TIMEOUT = (
+    float(os.environ['NEO4J_LIVENESS_CHECK_TIMEOUT']) if os.getenv('NEO4J_LIVENESS_CHECK_TIMEOUT') else 30.0
+)
+NEO4J_FETCH_SIZE = int(os.getenv('NEO4J_FETCH_SIZE', 1000))   # registros por lote al leer resultados
 
 
 
@@ -67,6 +74,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'api.profiler.CypherProfilerMiddleware',   # Server-Timing y log de consultas Cypher
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -161,3 +169,48 @@ REST_FRAMEWORK = {
     ],
     # opcional: paginación, permiso por defecto, etc.
 }
+
+# Segundos que cada proceso reutiliza la versión del dataset leída de Neo4j (api/dataset.py)
+DATASET_VERSION_TTL = float(os.getenv('DATASET_VERSION_TTL', 5))
+
+# Segundos que se cachean los conteos de /api/piezas/facets/ por combinación de filtros
+FACETS_CACHE_TIMEOUT = int(os.getenv('FACETS_CACHE_TIMEOUT', 300))
+
+# Versiones web de las imágenes (api/derivados.py): carpeta, formato ('webp' o 'jpeg') y calidad
+DERIVADOS_ROOT = os.getenv('DERIVADOS_ROOT', str(MEDIA_ROOT / '_derivados'))
+DERIVADOS_FORMATO = os.getenv('DERIVADOS_FORMATO', 'webp')
+DERIVADOS_CALIDAD = int(os.getenv('DERIVADOS_CALIDAD', 80))
+
+# Cómo se entregan los archivos de MEDIA_ROOT (api/media.py): 'django', 'x-accel' (nginx)
+# o 'x-sendfile' (Apache/lighttpd). Con 'x-accel', MEDIA_ACCEL_PREFIX es la location
+# `internal` de nginx que apunta a MEDIA_ROOT (y DERIVADOS_ROOT debe quedar dentro de ella).
+MEDIA_SERVE_MODE = os.getenv('MEDIA_SERVE_MODE', 'django')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/_media/')
+
+# Máximo de piezas por llamada a /api/piezas/bulk/
+PIEZAS_BULK_MAX = int(os.getenv('PIEZAS_BULK_MAX', 200))
+
+# Excel del inventario ya leído y limpio, por hash de contenido (api/management/commands/_excel.py)
+IMPORT_CACHE_DIR = os.getenv('IMPORT_CACHE_DIR', str(BASE_DIR / '.cache' / 'inventario'))
+
+# Perfil de consultas Cypher por request (api/profiler.py): umbral de consulta lenta (ms)
+# y si además se registra su plan de PROFILE (sólo lecturas, una vez por consulta). El
+# PROFILE vuelve a ejecutar la consulta dentro del mismo request: activarlo sólo para diagnosticar
+CYPHER_SLOW_QUERY_MS = float(os.getenv('CYPHER_SLOW_QUERY_MS', 500))
+CYPHER_PROFILE_SLOW = os.getenv('CYPHER_PROFILE_SLOW', '0') == '1'
+
+# Logger `api.cypher`: WARNING sólo muestra consultas lentas; INFO agrega una línea JSON por request
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.cypher': {
+            'handlers': ['console'],
+            'level': os.getenv('CYPHER_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
@@ -17,13 +17,12 @@ Including another URLconf
 # backend/urls.py
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from api.views import (
     PiezaViewSet, ComponenteViewSet, ImagenViewSet, 
     AutorViewSet, PaisViewSet, LocalidadViewSet, 
-    TipologiaViewSet, ColeccionViewSet
+    TipologiaViewSet, ColeccionViewSet, SuggestViewSet, derivado, media, neo4j_pool
 )
 
 router = DefaultRouter()
@@ -35,16 +34,13 @@ router.register(r'colecciones', ColeccionViewSet, basename='coleccion')
 router.register(r'autores', AutorViewSet, basename='autor')
 router.register(r'localidades', LocalidadViewSet, basename='localidad')
 router.register(r'tipologias', TipologiaViewSet, basename='tipologia')
+router.register(r'suggest', SuggestViewSet, basename='suggest')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/derivados/<str:rendicion>/<str:file_hash>/', derivado, name='derivado'),
+    path('api/estado/neo4j/', neo4j_pool, name='neo4j-pool'),
     path('api/', include(router.urls)),
+    # Archivos de MEDIA_ROOT en MEDIA_URL (en producción, vía nginx/Apache según MEDIA_SERVE_MODE)
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", media, name='media'),
 ]
-
-
-# En DEBUG, servir archivos de MEDIA_ROOT en MEDIA_URL
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT
-    )